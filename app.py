@@ -1,5 +1,8 @@
 import streamlit as st
 
+from utils.cache import render_cache_panel
+from utils.tracing import render_trace_panel, tracer
+
 st.set_page_config(layout="wide")
 
 pages = [
@@ -10,4 +13,11 @@ pages = [
 
 pg = st.navigation(pages)
 
-pg.run()
\ No newline at end of file
+# O toggle do painel é desenhado depois da página, por isso o valor vem do rerun anterior
+tracer.enabled = st.session_state.get('perf_trace', tracer.default_enabled)
+tracer.start_run()
+
+pg.run()
+
+render_cache_panel()
+render_trace_panel()
@@ -0,0 +1,56 @@
+import time
+
+import numpy as np
+import pandas as pd
+
+from utils.clustering import aggregate_player_metrics
+
+
+def legacy_aggregate(df):
+    # Implementação original, com a moda calculada por um lambda por jogador
+    id_cols = ['player_name', 'team', 'role', 'gender']
+
+    df = df.drop('match_id', axis=1)
+
+    grouped = df.groupby('player_name', observed=True)
+    meta = grouped[id_cols[1:]].agg(lambda x: x.mode()[0])
+    metrics = grouped.mean(numeric_only=True)
+
+    return meta.join(metrics, on='player_name').reset_index()
+
+
+def player_match_rows(n_rows, n_players, seed=0):
+    rng = np.random.default_rng(seed)
+    base = pd.read_csv('data/defenders.csv')
+    sample = base.sample(n_rows, replace=True, random_state=seed).reset_index(drop=True)
+    sample['player_name'] = 'Player ' + pd.Series(rng.integers(0, n_players, n_rows)).astype(str)
+    sample['team'] = 'Team ' + pd.Series(rng.integers(0, 3, n_rows)).astype(str)
+    sample['gender'] = np.where(rng.random(n_rows) < 0.5, 'female', 'male')
+    return sample
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+def main(n_rows=1_000_000, n_players=20_000, chunk_size=100_000):
+    df = player_match_rows(n_rows, n_players)
+
+    expected, legacy_time = timed(legacy_aggregate, df)
+    result, vectorized_time = timed(aggregate_player_metrics, df)
+    pd.testing.assert_frame_equal(result, expected, check_dtype=False)
+
+    chunks = (df.iloc[i:i + chunk_size] for i in range(0, n_rows, chunk_size))
+    chunked, chunked_time = timed(aggregate_player_metrics, chunks)
+    pd.testing.assert_frame_equal(chunked, expected, check_dtype=False)
+
+    print(f"{n_rows} player-match rows, {n_players} players, output identical to mode()[0]")
+    print(f"lambda mode:  {legacy_time:7.2f} s")
+    print(f"vectorized:   {vectorized_time:7.2f} s ({legacy_time / vectorized_time:.0f}x)")
+    print(f"chunks of {chunk_size}: {chunked_time:7.2f} s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+import argparse
+import json
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from utils.archive import EventArchive, archive_mirror
+from utils.synthetic import write_mirror
+
+
+def disk_usage(paths):
+    # Blocos ocupados, não só o tamanho: muitos ficheiros pequenos desperdiçam o resto de cada bloco
+    return sum(path.stat().st_blocks * 512 for path in paths)
+
+
+def latencies(read, match_ids, repeats):
+    times = []
+    for _ in range(repeats):
+        for match_id in match_ids:
+            start = time.perf_counter()
+            read(match_id)
+            times.append(time.perf_counter() - start)
+    return statistics.median(times) * 1000, sorted(times)[int(len(times) * 0.95)] * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Arquivo comprimido vs ficheiros JSON soltos")
+    parser.add_argument('--matches', type=int, default=100)
+    parser.add_argument('--repeats', type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        write_mirror(root / 'mirror', args.matches)
+        files = sorted((root / 'mirror' / 'data' / 'events').glob('*.json'))
+        match_ids = [int(file.stem) for file in files]
+        loose = disk_usage(files)
+
+        print(f"{args.matches} matches, loose JSON: {loose / 2 ** 20:.1f} MiB on disk")
+        for level in (1, 6, 9):
+            start = time.perf_counter()
+            archive = archive_mirror(root / 'mirror', root / f'events-{level}.arc', level)
+            elapsed = time.perf_counter() - start
+            size = disk_usage([archive.path, archive.index_path])
+            print(f"  zlib level {level}: {size / 2 ** 20:6.1f} MiB ({loose / size:.1f}x smaller), built in {elapsed:.1f} s")
+
+        archive = EventArchive(root / 'events-6.arc')
+        for match_id, file in zip(match_ids, files):
+            assert archive.get_bytes(match_id) == file.read_bytes()
+
+        by_id = dict(zip(match_ids, files))
+        raw_loose = latencies(lambda match_id: by_id[match_id].read_bytes(), match_ids, args.repeats)
+        raw_archive = latencies(archive.get_bytes, match_ids, args.repeats)
+        json_loose = latencies(lambda match_id: json.loads(by_id[match_id].read_bytes()), match_ids, args.repeats)
+        json_archive = latencies(archive.get_json, match_ids, args.repeats)
+
+        print("per-match read (median / p95 ms, page cache warm):")
+        print(f"  bytes  loose {raw_loose[0]:6.2f} / {raw_loose[1]:6.2f}   archive {raw_archive[0]:6.2f} / {raw_archive[1]:6.2f}")
+        print(f"  json   loose {json_loose[0]:6.2f} / {json_loose[1]:6.2f}   archive {json_archive[0]:6.2f} / {json_archive[1]:6.2f}")
+
+        start = time.perf_counter()
+        count = sum(1 for _ in archive)
+        elapsed = time.perf_counter() - start
+        print(f"sequential iteration: {count} matches in {elapsed:.2f} s ({count / elapsed:.0f} matches/s)")
+
+
+if __name__ == '__main__':
+    main()
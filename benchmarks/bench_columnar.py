@@ -0,0 +1,73 @@
+import json
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from utils.columnar import write_table
+
+# Mede cada leitura num processo novo para que o RSS não seja afetado pelas anteriores
+LOAD_SCRIPT = """
+import json, sys, time, resource
+import numpy as np, pandas as pd
+sys.path.insert(0, {root!r})
+from utils.columnar import read_table
+
+def rss():
+    with open('/proc/self/statm') as f:
+        return int(f.read().split()[1]) * resource.getpagesize()
+
+before = rss()
+start = time.perf_counter()
+df = pd.read_csv({path!r}) if {csv} else read_table({path!r})
+load_time = time.perf_counter() - start
+after_load = rss()
+df.select_dtypes('number').sum()
+after_scan = rss()
+print(json.dumps({{'load': load_time, 'rss_load': after_load - before, 'rss_scan': after_scan - before}}))
+"""
+
+
+def scaled_table(csv_path, factor, seed=0):
+    rng = np.random.default_rng(seed)
+    df = pd.read_csv(csv_path)
+    big = pd.concat([df] * factor, ignore_index=True)
+    big['match_id'] = big['match_id'] + np.repeat(np.arange(factor), len(df)) * 10_000_000
+    numeric = big.select_dtypes('float').columns
+    big[numeric] = big[numeric] * rng.uniform(0.9, 1.1, (len(big), len(numeric)))
+    return big
+
+
+def load(path, csv):
+    root = str(Path(__file__).resolve().parent.parent)
+    script = LOAD_SCRIPT.format(root=root, path=str(path), csv=csv)
+    output = subprocess.run([sys.executable, '-c', script], capture_output=True, text=True, check=True).stdout
+    return json.loads(output)
+
+
+def main(factor=100):
+    with tempfile.TemporaryDirectory() as tmp:
+        for name in ('attackers', 'defenders'):
+            big = scaled_table(f'data/{name}.csv', factor)
+            csv_path = Path(tmp) / f'{name}.csv'
+            cols_path = Path(tmp) / f'{name}.cols'
+            big.to_csv(csv_path, index=False)
+            write_table(big, cols_path)
+
+            csv_size = csv_path.stat().st_size
+            cols_size = sum(p.stat().st_size for p in cols_path.iterdir())
+            csv_stats = load(csv_path, csv=True)
+            cols_stats = load(cols_path, csv=False)
+
+            print(f"{name}: {len(big)} rows ({factor}x)")
+            print(f"  csv      {csv_size / 2 ** 20:7.1f} MiB on disk  load {csv_stats['load'] * 1000:8.1f} ms"
+                  f"  rss {csv_stats['rss_load'] / 2 ** 20:6.1f} MiB (after scan {csv_stats['rss_scan'] / 2 ** 20:6.1f})")
+            print(f"  columnar {cols_size / 2 ** 20:7.1f} MiB on disk  load {cols_stats['load'] * 1000:8.1f} ms"
+                  f"  rss {cols_stats['rss_load'] / 2 ** 20:6.1f} MiB (after scan {cols_stats['rss_scan'] / 2 ** 20:6.1f})")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,38 @@
+import time
+
+from utils.clustering import aggregate_player_metrics, plot_metric_histograms
+from utils.synthetic import generate_player_tables
+
+# Nº de jogadores (já agregados) em cada escala
+PLAYERS = (1_000, 10_000, 100_000)
+
+
+def measure(df, mode):
+    # O tempo inclui o to_json, que é o que o streamlit faz antes de enviar a figura ao browser
+    start = time.perf_counter()
+    plots = plot_metric_histograms(df, mode=mode)
+    payload = sum(len(fig.to_json()) for _, fig in plots)
+    return time.perf_counter() - start, payload
+
+
+def main():
+    # Primeira chamada fora da medição (imports do plotly)
+    _, defenders = generate_player_tables(n_matches=50, n_players=100, seed=0)
+    small = aggregate_player_metrics(defenders.assign(gender='female'))
+    measure(small, 'raw')
+    measure(small, 'bars')
+
+    for n_players in PLAYERS:
+        _, defenders = generate_player_tables(n_matches=n_players // 2, n_players=n_players, seed=0)
+        df = aggregate_player_metrics(defenders.assign(gender='female'))
+        raw_time, raw_payload = measure(df, 'raw')
+        bars_time, bars_payload = measure(df, 'bars')
+        print(
+            f"{len(df):7d} players  raw: {raw_payload / 1024:9.1f} KiB {raw_time * 1000:8.1f} ms"
+            f"  bars: {bars_payload / 1024:6.1f} KiB {bars_time * 1000:7.1f} ms"
+            f"  ({raw_payload / bars_payload:.0f}x smaller)"
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,48 @@
+import time
+import tracemalloc
+
+import pandas as pd
+
+from benchmarks.fixtures import synthetic_raw_events
+from utils.individual_match import build_events
+
+
+def legacy_parse(data):
+    # Implementação original: json_normalize completo e apply linha a linha
+    events = pd.json_normalize(data)
+
+    events['time_seconds'] = events.apply(
+        lambda row: int(row['minute']) * 60 + int(row['second']), axis=1
+    )
+
+    events['time_bin'] = (events['time_seconds'] // 300).astype(int)
+    events = events[events["time_seconds"] != 0][['index', 'possession', 'possession_team.name', 'team.name', 'type.name', 'carry.end_location', 'time_seconds', 'time_bin']]
+
+    return events
+
+
+def measure(fn, data):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = fn(data)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def main(n_events=3500):
+    data = synthetic_raw_events(n_events=n_events, seed=2)
+
+    expected, legacy_time, legacy_peak = measure(legacy_parse, data)
+    result, projected_time, projected_peak = measure(build_events, data)
+    pd.testing.assert_frame_equal(result, expected)
+
+    print(f"{n_events} events, output identical to json_normalize")
+    print(f"json_normalize: {legacy_time * 1000:8.1f} ms  peak {legacy_peak / 2 ** 20:6.1f} MiB")
+    print(f"projected:      {projected_time * 1000:8.1f} ms  peak {projected_peak / 2 ** 20:6.1f} MiB")
+    print(f"speedup {legacy_time / projected_time:.1f}x, memory {legacy_peak / projected_peak:.1f}x lower")
+
+
+if __name__ == '__main__':
+    main()
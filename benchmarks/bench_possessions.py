@@ -0,0 +1,75 @@
+import time
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.bench_recovery import legacy_recovery
+from benchmarks.fixtures import synthetic_events
+from utils.individual_match import CHAIN_FIELDS, compute_recovery
+from utils.possessions import PITCH_LENGTH, entries_per_possession, possession_chains, recovery_from_chains
+from utils.zones import count_zone_entries
+
+
+def legacy_max_x(events):
+    # Referência evento a evento: maior x de cada posse, do ponto de vista da equipa com bola
+    furthest = {}
+    columns = ['match_id', 'possession', 'team.name', 'possession_team.name', 'location', 'carry.end_location']
+    for match_id, possession, team, possession_team, location, end_location in zip(*(events[c].tolist() for c in columns)):
+        xs = [value[0] for value in (location, end_location) if isinstance(value, list)]
+        if not xs:
+            continue
+        x = max(xs) if team == possession_team else PITCH_LENGTH - max(xs)
+        key = (match_id, possession)
+        furthest[key] = max(furthest.get(key, -np.inf), x)
+    return furthest
+
+
+def timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def main(n_matches=20):
+    season = synthetic_events(n_matches=n_matches, seed=1, fields=CHAIN_FIELDS)
+    matches = [m.drop(columns='match_id').reset_index(drop=True) for _, m in season.groupby('match_id')]
+
+    chains, build_time = timed(possession_chains, season)
+    boundaries, bounds_time = timed(possession_chains, season, locations=False)
+    assert chains['n_events'].sum() == len(season)
+
+    # max_x contra o ciclo evento a evento (as posses sintéticas são contíguas)
+    expected_x = legacy_max_x(season.head(3 * len(matches[0])))
+    for row in chains[chains['match_id'] < 3].itertuples(index=False):
+        assert np.isclose(row.max_x, expected_x.get((row.match_id, row.possession), np.nan), equal_nan=True), row
+
+    # Recuperação a partir das posses contra o ciclo iloc original
+    legacy_total = chain_total = 0.0
+    for events in matches:
+        expected, legacy_time = timed(legacy_recovery, events)
+        match_chains = possession_chains(events, locations=False)
+        result, chain_time = timed(recovery_from_chains, match_chains, events)
+        pd.testing.assert_frame_equal(result, expected)
+        legacy_total += legacy_time
+        chain_total += chain_time
+
+    _, scan_time = timed(compute_recovery, season)
+    _, reuse_time = timed(recovery_from_chains, boundaries, season)
+
+    entries, entries_time = timed(entries_per_possession, chains, season)
+    counts = count_zone_entries(season).groupby('zone')['entries'].sum()
+    assert entries.sum().to_dict() == counts.to_dict(), (entries.sum(), counts)
+
+    print(f"{n_matches} matches, {len(season)} events -> {len(chains)} possessions ({len(season) / len(chains):.0f}x smaller)")
+    print(f"max_x identical to the event loop, recovery identical to the iloc loop")
+    print(f"build chains (boundaries only):   {bounds_time * 1000:8.1f} ms")
+    print(f"build chains (with max_x):        {build_time * 1000:8.1f} ms")
+    print(f"recovery, iloc loop:              {legacy_total * 1000:8.1f} ms")
+    print(f"recovery, prebuilt chains:        {chain_total * 1000:8.1f} ms ({legacy_total / chain_total:.0f}x)")
+    print(f"season recovery, building chains: {scan_time * 1000:8.1f} ms")
+    print(f"season recovery, reusing chains:  {reuse_time * 1000:8.1f} ms")
+    print(f"entries per possession:           {entries_time * 1000:8.1f} ms, totals match count_zone_entries")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+import time
+
+import pandas as pd
+
+from benchmarks.fixtures import synthetic_events
+from utils.individual_match import compute_recovery
+
+
+def legacy_recovery(events):
+    # Implementação original (ciclo com iloc), mantida como referência
+    recovery_events = []
+
+    last_team = events.iloc[0]['possession_team.name']
+    last_time = events.iloc[0]['time_seconds']
+
+    for i in range(1, len(events)):
+        curr = events.iloc[i]
+        curr_team = curr['possession_team.name']
+        curr_time = curr['time_seconds']
+
+        if curr_team != last_team:
+            recovery_time = curr_time - last_time
+
+            recovery_events.append({
+                'lost_by': last_team,
+                'recovered_by': curr_team,
+                'recovery_time': recovery_time,
+                'time_seconds': curr_time,
+                'time_bin': curr['time_bin']
+            })
+
+            last_team = curr_team
+            last_time = curr_time
+
+    change_possession = pd.DataFrame(recovery_events)
+
+    recovery_df = change_possession[change_possession['recovery_time'] > 0].copy()
+    recovery_df['minute'] = (recovery_df['time_seconds'] // 60).astype(int)
+
+    return recovery_df
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+def main(n_matches=20):
+    season = synthetic_events(n_matches=n_matches, seed=1)
+    matches = [m.drop(columns='match_id').reset_index(drop=True) for _, m in season.groupby('match_id')]
+
+    legacy_total = vectorized_total = 0.0
+    for events in matches:
+        expected, legacy_time = timed(legacy_recovery, events)
+        result, vectorized_time = timed(compute_recovery, events)
+        pd.testing.assert_frame_equal(result, expected)
+        legacy_total += legacy_time
+        vectorized_total += vectorized_time
+
+    season_result, season_time = timed(compute_recovery, season)
+    per_match = pd.concat([compute_recovery(m).assign(match_id=i) for i, m in enumerate(matches)], ignore_index=True)
+    pd.testing.assert_frame_equal(
+        season_result.reset_index(drop=True),
+        per_match[season_result.columns],
+        check_dtype=False,
+    )
+
+    print(f"{n_matches} matches, output identical to the iloc loop")
+    print(f"iloc loop:    {legacy_total / n_matches * 1000:8.1f} ms/match")
+    print(f"vectorized:   {vectorized_total / n_matches * 1000:8.1f} ms/match ({legacy_total / vectorized_total:.0f}x)")
+    print(f"whole season in one call: {season_time * 1000:8.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
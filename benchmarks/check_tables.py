@@ -0,0 +1,78 @@
+import argparse
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from utils.fetch import DiskCache, Fetcher, set_fetcher
+from utils.season import ATTACKER_COLUMNS, DEFENDER_COLUMNS, player_match_metrics
+
+KEYS = ['match_id', 'player_name', 'role']
+
+# Diferenças conhecidas em relação aos CSV de data/, cuja origem exata não está no repositório:
+# - touches_in_box: toques (TOUCH_TYPES) dentro da área; os CSV podem usar outra definição
+# - aerial_duels_won: flags *.aerial_won, a única forma como a StatsBomb marca um aéreo ganho
+# Enquanto um jogo dos CSV não der zero diferenças, utils.season escreve em build/ e não em data/
+
+
+def compare(expected, result, columns, rtol=1e-6, atol=1e-9):
+    # Uma linha por (jogador, coluna) que difere, mais os jogadores que só existem de um dos lados
+    merged = expected.merge(result, on=KEYS, how='outer', suffixes=('_csv', '_new'), indicator=True)
+    differences = []
+    one_side = merged[merged['_merge'] != 'both']
+    for match_id, player_name, merge in zip(one_side['match_id'], one_side['player_name'], one_side['_merge']):
+        side = 'csv' if merge == 'left_only' else 'rebuilt'
+        differences.append((match_id, player_name, '(row)', f'only in {side}', ''))
+
+    both = merged[merged['_merge'] == 'both']
+    for column in columns:
+        if column in KEYS:
+            continue
+        old, new = both[f'{column}_csv'], both[f'{column}_new']
+        if pd.api.types.is_numeric_dtype(old) and pd.api.types.is_numeric_dtype(new):
+            same = np.isclose(old.to_numpy(dtype=float), new.to_numpy(dtype=float), rtol=rtol, atol=atol, equal_nan=True)
+        else:
+            same = (old.astype(str) == new.astype(str)).to_numpy()
+        for row_old, row_new, (_, row) in zip(old[~same], new[~same], both[~same].iterrows()):
+            differences.append((row['match_id'], row['player_name'], column, row_old, row_new))
+    return pd.DataFrame(differences, columns=['match_id', 'player_name', 'column', 'csv', 'rebuilt'])
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Reconstrói jogos a partir dos eventos e compara-os com as linhas de data/attackers.csv e data/defenders.csv"
+    )
+    parser.add_argument('match_ids', nargs='*', type=int, default=[3775648])
+    parser.add_argument('--mirror', default=None, help="checkout local do open-data")
+    parser.add_argument('--offline', action='store_true')
+    parser.add_argument('--data', default='data', help="pasta com os CSV de referência")
+    args = parser.parse_args()
+
+    set_fetcher(Fetcher(cache=DiskCache(), mirror=args.mirror, offline=args.offline))
+    tables = {
+        'attackers': (pd.read_csv(Path(args.data) / 'attackers.csv'), ATTACKER_COLUMNS),
+        'defenders': (pd.read_csv(Path(args.data) / 'defenders.csv'), DEFENDER_COLUMNS),
+    }
+
+    failed = False
+    for match_id in args.match_ids:
+        rebuilt = dict(zip(tables, player_match_metrics(match_id)))
+        for name, (csv, columns) in tables.items():
+            expected = csv[csv['match_id'] == match_id]
+            if expected.empty:
+                print(f"{match_id} {name}: not in {args.data}/{name}.csv, skipped")
+                continue
+            differences = compare(expected, rebuilt[name], columns)
+            if differences.empty:
+                print(f"{match_id} {name}: {len(expected)} rows identical")
+                continue
+            failed = True
+            print(f"{match_id} {name}: {len(differences)} differences")
+            print(differences.to_string(index=False))
+            print(differences.groupby('column').size().rename('players').to_string())
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
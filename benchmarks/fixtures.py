@@ -0,0 +1,19 @@
+import pandas as pd
+
+from utils.individual_match import EVENT_FIELDS, build_events
+from utils.synthetic import generate_match_events
+
+
+def synthetic_raw_events(n_events=3500, seed=0):
+    # Lista de eventos no formato JSON da StatsBomb (antes do json_normalize)
+    return generate_match_events(0, n_events=n_events, seed=seed)
+
+
+def synthetic_events(n_events=3500, n_matches=1, seed=0, fields=EVENT_FIELDS):
+    # Frame com o mesmo formato que process_events devolve (com fields=EVENT_FIELDS), com uma coluna match_id
+    frames = []
+    for match_id in range(n_matches):
+        events = build_events(generate_match_events(match_id, n_events=n_events, seed=seed), fields)
+        events.insert(0, 'match_id', match_id)
+        frames.append(events)
+    return pd.concat(frames, ignore_index=True)
@@ -0,0 +1,227 @@
+import argparse
+import gc
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Os modelos não podem vir da cache em disco, senão mediríamos uma leitura e não o ajuste
+MODEL_DIR = tempfile.mkdtemp(prefix='bench-models-')
+os.environ['MODEL_STORE_DIR'] = MODEL_DIR
+
+from benchmarks.fixtures import synthetic_events, synthetic_raw_events
+from utils.clustering import (
+    aggregate_player_metrics,
+    plot_umap_interactive,
+    rename_for_display,
+    run_clustering_plotly,
+)
+from utils.individual_match import build_events, compute_danger_zones, compute_recovery, get_two_metrics
+
+HERE = Path(__file__).resolve().parent
+RESULTS = HERE / 'results.json'
+BASELINE = HERE / 'baseline.json'
+
+SCALES = (1, 10, 100)
+# Escalas por omissão para as funções mais lentas (--full corre todas)
+SLOW_SCALES = {'plot_umap_interactive': (1, 10)}
+
+
+def player_rows(scale, seed=0):
+    rng = np.random.default_rng(seed)
+    df = pd.read_csv(HERE.parent / 'data' / 'defenders.csv')
+    df['gender'] = np.where(df['match_id'] % 2 == 0, 'female', 'male')
+    if scale == 1:
+        return df
+    copies = []
+    for i in range(scale):
+        copy = df.copy()
+        copy['player_name'] = copy['player_name'] + f' #{i}'
+        numeric = copy.select_dtypes('number').columns.drop('match_id')
+        copy[numeric] = copy[numeric] * rng.uniform(0.8, 1.2, (len(copy), len(numeric)))
+        copies.append(copy)
+    return pd.concat(copies, ignore_index=True)
+
+
+def setup_build_events(scale):
+    matches = [synthetic_raw_events(seed=i) for i in range(scale)]
+    return lambda: [build_events(data) for data in matches]
+
+
+def setup_compute_recovery(scale):
+    events = synthetic_events(n_matches=scale)
+    return lambda: compute_recovery(events)
+
+
+def setup_compute_danger_zones(scale):
+    events = synthetic_events(n_matches=scale)
+    return lambda: compute_danger_zones(events)
+
+
+def setup_get_two_metrics(scale):
+    events = synthetic_events(n_matches=scale)
+    recovery_df = compute_recovery(events)
+    events_danger, _ = compute_danger_zones(events)
+    return lambda: get_two_metrics(recovery_df, events_danger.copy())
+
+
+def setup_aggregate_player_metrics(scale):
+    df = player_rows(scale)
+    return lambda: aggregate_player_metrics(df)
+
+
+def setup_run_clustering_plotly(scale):
+    players = rename_for_display(aggregate_player_metrics(player_rows(scale)))
+    return lambda: run_clustering_plotly(players)
+
+
+def setup_plot_umap_interactive(scale):
+    players = rename_for_display(aggregate_player_metrics(player_rows(scale)))
+    clustered, _, X_pca, _ = run_clustering_plotly(players)
+    return lambda: plot_umap_interactive(clustered, X_pca)
+
+
+BENCHMARKS = {
+    'build_events': setup_build_events,
+    'compute_recovery': setup_compute_recovery,
+    'compute_danger_zones': setup_compute_danger_zones,
+    'get_two_metrics': setup_get_two_metrics,
+    'aggregate_player_metrics': setup_aggregate_player_metrics,
+    'run_clustering_plotly': setup_run_clustering_plotly,
+    'plot_umap_interactive': setup_plot_umap_interactive,
+}
+
+
+def clear_models():
+    shutil.rmtree(MODEL_DIR, ignore_errors=True)
+
+
+def measure(fn, repeats):
+    # Primeira chamada fora da medição (imports, JIT do numba, threads do sklearn)
+    clear_models()
+    fn()
+
+    times = []
+    for _ in range(repeats):
+        clear_models()
+        gc.collect()
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+
+    clear_models()
+    gc.collect()
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    # Mediana e desvio absoluto mediano: robustos a uma ou duas corridas perturbadas
+    median = float(np.median(times))
+    return {'seconds': median, 'seconds_mad': float(np.median(np.abs(np.array(times) - median))), 'runs': times,
+            'peak_bytes': peak}
+
+
+def environment():
+    # Gravado com os resultados: tempos de máquinas ou versões diferentes não são comparáveis
+    import sklearn
+    import umap
+
+    return {
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'pandas': pd.__version__,
+        'numpy': np.__version__,
+        'scikit-learn': sklearn.__version__,
+        'umap-learn': umap.__version__,
+    }
+
+
+# Só entram no gate os tempos bem acima do ruído de medição; os outros são apenas reportados
+MIN_GATED_SECONDS = 0.2
+# Margem em desvios absolutos medianos (da baseline e da corrida atual) além do limiar relativo
+MAD_FACTOR = 5
+MIN_DELTA_BYTES = 256 * 1024
+
+
+def compare(results, baseline, threshold):
+    regressions = []
+    for name, scales in results['benchmarks'].items():
+        for scale, result in scales.items():
+            reference = baseline.get('benchmarks', {}).get(name, {}).get(scale)
+            if reference is None:
+                continue
+            seconds, before = result['seconds'], reference['seconds']
+            noise = MAD_FACTOR * (reference.get('seconds_mad', 0) + result.get('seconds_mad', 0))
+            gated = before >= MIN_GATED_SECONDS and len(result.get('runs', ())) >= 3
+            if gated and seconds > before * (1 + threshold) and seconds - before > noise:
+                regressions.append((name, scale, 'seconds', before, seconds))
+            peak, before = result['peak_bytes'], reference['peak_bytes']
+            if peak > before * (1 + threshold) and peak - before > MIN_DELTA_BYTES:
+                regressions.append((name, scale, 'peak_bytes', before, peak))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks das funções de utils a várias escalas (offline)")
+    parser.add_argument('--only', nargs='*', default=list(BENCHMARKS), choices=list(BENCHMARKS))
+    parser.add_argument('--scales', nargs='*', type=int, default=None)
+    parser.add_argument('--full', action='store_true', help="corre também as funções lentas em todas as escalas")
+    parser.add_argument('--repeats', type=int, default=5)
+    parser.add_argument('--output', default=str(RESULTS))
+    parser.add_argument('--baseline', default=str(BASELINE))
+    parser.add_argument('--threshold', type=float, default=0.25, help="aumento relativo considerado regressão")
+    parser.add_argument('--save-baseline', action='store_true')
+    args = parser.parse_args()
+
+    results = {**environment(), 'benchmarks': {}}
+    for name in args.only:
+        scales = args.scales or (SCALES if args.full else SLOW_SCALES.get(name, SCALES))
+        results['benchmarks'][name] = {}
+        for scale in scales:
+            fn = BENCHMARKS[name](scale)
+            repeats = min(args.repeats, 3) if name in SLOW_SCALES else args.repeats
+            result = measure(fn, repeats)
+            results['benchmarks'][name][str(scale)] = result
+            print(
+                f"{name:26s} {scale:4d}x {result['seconds'] * 1000:10.1f} ms ±{result['seconds_mad'] * 1000:6.1f} "
+                f"{result['peak_bytes'] / 2 ** 20:9.1f} MiB",
+                flush=True,
+            )
+
+    Path(args.output).write_text(json.dumps(results, indent=2))
+    clear_models()
+
+    if args.save_baseline:
+        Path(args.baseline).write_text(json.dumps(results, indent=2))
+        print(f"baseline saved to {args.baseline}")
+        return 0
+
+    if not Path(args.baseline).exists():
+        print(f"no baseline at {args.baseline}; run with --save-baseline to create one")
+        return 0
+
+    baseline = json.loads(Path(args.baseline).read_text())
+    different = {key: (baseline.get(key), value) for key, value in environment().items() if baseline.get(key) != value}
+    for key, (before, after) in different.items():
+        print(f"note: baseline recorded with {key}={before}, running with {after}")
+    if different:
+        print("timings from a different environment may flag false regressions; re-record with --save-baseline")
+
+    regressions = compare(results, baseline, args.threshold)
+    for name, scale, metric, before, after in regressions:
+        print(f"REGRESSION {name} {scale}x {metric}: {before:.4g} -> {after:.4g} ({after / before - 1:+.0%})")
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,86 @@
+import argparse
+import ast
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Orçamento de arranque a frio (segundos de imports) por ficheiro
+BUDGETS = {
+    'app.py': 2.0,
+    'pages/0_individual_match.py': 2.5,
+    'pages/1_clustering.py': 2.5,
+    'pages/2_notes.py': 1.5,
+}
+# Nunca devem ser importados só por abrir uma página
+FORBIDDEN = ('umap', 'numba', 'pynndescent')
+
+IMPORTTIME = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)$')
+
+
+def import_statements(path):
+    # Só os imports de topo: executar a página faria pedidos à rede e chamadas ao streamlit
+    tree = ast.parse(Path(path).read_text())
+    return '\n'.join(ast.unparse(node) for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom)))
+
+
+def profile(path):
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', import_statements(ROOT / path)],
+        cwd=ROOT, capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"{path}: imports failed\n{result.stderr[-2000:]}")
+
+    modules = []
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            modules.append((name, len(indent) // 2, int(self_us) / 1e6, int(cumulative_us) / 1e6))
+    return modules
+
+
+def summarize(modules):
+    # Os módulos de nível 0 são os importados directamente; o cumulativo deles soma o tempo total
+    top_level = [(name, cumulative) for name, depth, _, cumulative in modules if depth == 0]
+    total = sum(cumulative for _, cumulative in top_level)
+    roots = {name.split('.')[0] for name, *_ in modules}
+    return total, sorted(top_level, key=lambda item: -item[1]), roots
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tempo de import a frio do app.py e de cada página")
+    parser.add_argument('targets', nargs='*', default=list(BUDGETS))
+    parser.add_argument('--repeats', type=int, default=3)
+    parser.add_argument('--top', type=int, default=8)
+    parser.add_argument('--no-budget', action='store_true', help="só mostra os tempos, sem falhar")
+    args = parser.parse_args()
+
+    failures = []
+    for target in args.targets:
+        # Cada repetição é um interpretador novo; fica o melhor para reduzir o ruído
+        runs = [summarize(profile(target)) for _ in range(args.repeats)]
+        total, top_level, roots = min(runs, key=lambda run: run[0])
+
+        budget = BUDGETS.get(target)
+        status = '' if budget is None else f" (budget {budget:.1f} s)"
+        print(f"{target}: {total:.3f} s{status}")
+        for name, cumulative in top_level[:args.top]:
+            print(f"    {cumulative * 1000:9.1f} ms  {name}")
+
+        forbidden = sorted(roots.intersection(FORBIDDEN))
+        if forbidden:
+            failures.append(f"{target} imports {', '.join(forbidden)} at startup")
+        if budget is not None and total > budget:
+            failures.append(f"{target} took {total:.3f} s to import, budget is {budget:.1f} s")
+
+    for failure in failures:
+        print(f"FAIL {failure}")
+    return 1 if failures and not args.no_budget else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
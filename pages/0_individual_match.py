@@ -4,6 +4,10 @@ import plotly.express as px
 import plotly.graph_objects as go
 import plotly.subplots as sp
 from utils.individual_match import get_recovery, get_danger_zones, get_two_metrics
+from utils.cache import cached
+
+get_recovery = cached(get_recovery)
+get_danger_zones = cached(get_danger_zones)
 
 st.markdown("<h1 style='text-align: center; color: white;'>Chelsea FCW - Reading WFC (09/05/2019), para a FA Women\'s Super League, época 2020/2021</h1>", unsafe_allow_html=True)
 
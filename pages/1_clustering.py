@@ -1,10 +1,9 @@
 import streamlit as st
 from PIL import Image
 import pandas as pd
-from sklearn.metrics import silhouette_score
 
+from utils.columnar import read_player_table
 from utils.clustering import (
-    get_matches_df, 
     aggregate_player_metrics, 
     plot_correlation_heatmap, 
     rename_for_display, 
@@ -13,8 +12,24 @@ from utils.clustering import (
     plot_umap_interactive, 
     plot_radar_chart, 
     plot_size,
-    plot_gender_distribution
+    plot_gender_distribution,
+    plot_k_selection,
+    get_similarity_index,
+    predict_profiles,
+    split_features
 )
+from utils.cache import cached
+from utils.k_selection import sweep_k, best_k
+from utils.match_index import MatchIndex
+
+# Resultados partilhados entre reruns e páginas, identificados pelos dados e parâmetros
+aggregate_player_metrics = cached(aggregate_player_metrics)
+plot_correlation_heatmap = cached(plot_correlation_heatmap)
+plot_metric_histograms = cached(plot_metric_histograms)
+run_clustering_plotly = cached(run_clustering_plotly)
+plot_umap_interactive = cached(plot_umap_interactive)
+sweep_k = cached(sweep_k)
+get_similarity_index = cached(get_similarity_index)
 
 st.markdown("<h1 style='text-align: center; color: white;'>Perfis de Jogadores</h1>", unsafe_allow_html=True)
 
@@ -81,22 +96,24 @@ st.markdown("""
 | `final_third_entries`         | Defesas e Avançados        | Número médio de vezes em que o jogador levou a bola até à zona de ataque, por jogo e por jogador       |
 """)
 
-defenders = pd.read_csv('data/defenders.csv')
-attackers = pd.read_csv('data/attackers.csv')
+defenders = read_player_table('data/defenders.csv')
+attackers = read_player_table('data/attackers.csv')
 
 competition_id_woman = 37
 season_id_woman = 90
-woman_matches = get_matches_df(competition_id_woman, season_id_woman)
 
 competition_id_man = 2
 season_id_man = 27
-man_matches = get_matches_df(competition_id_man, season_id_man)
-
-all_matches = pd.concat([woman_matches, man_matches])
 
+# Índice dos jogos guardado em disco: o género vem de um lookup por match_id, sem pedidos nem merge.
+# Não passa pela cache de resultados: a leitura é rápida e assim cada rerun vê se o ficheiro de jogos mudou
+rebuild_match_index = st.sidebar.button("Atualizar lista de jogos")
+match_index = MatchIndex.load(
+    ((competition_id_woman, season_id_woman), (competition_id_man, season_id_man)), rebuild=rebuild_match_index
+)
 
-defenders = defenders.merge(all_matches[['match_id', 'home_team.home_team_gender']], how='inner', on='match_id').rename(columns={'home_team.home_team_gender': 'gender'})
-attackers = attackers.merge(all_matches[['match_id', 'home_team.home_team_gender']], how='inner', on='match_id').rename(columns={'home_team.home_team_gender': 'gender'})
+defenders = match_index.attach(defenders, columns=['gender'])
+attackers = match_index.attach(attackers, columns=['gender'])
 
 avg_defenders = aggregate_player_metrics(defenders)
 avg_attackers = aggregate_player_metrics(attackers)
@@ -213,6 +230,11 @@ with tab1:
     clustered_defenders, kmeans_defenders, X_pca, X_scaled = run_clustering_plotly(rename_for_display(avg_defenders), pca_comp=2, n_clusters=4, role_name="Defenders")
     fig = plot_umap_interactive(clustered_defenders, X_pca, title="UMAP de jogadores Defesas")
 
+    with st.expander("Escolha do número de clusters"):
+        k_sweep = sweep_k(X_scaled)
+        st.plotly_chart(plot_k_selection(k_sweep, chosen_k=4, title="Inércia e silhouette por k - Defesas"), use_container_width=True)
+        st.caption(f"Melhor silhouette com k = {best_k(k_sweep)}. Os perfis abaixo usam k = 4.")
+
     st.plotly_chart(fig, use_container_width=True)
     st.write(
         """
@@ -371,6 +393,13 @@ with tab1:
         - Exemplo de perfil: **Virgil van Dijk, Rúben Dias, Aymeric Laporte**.
         """)
 
+    st.markdown("<h5 style='text-align: center; color: white;'>Jogadores Semelhantes</h5>", unsafe_allow_html=True)
+    similarity_index = get_similarity_index(rename_for_display(avg_defenders), pca_comp=2, n_clusters=4)
+    player = st.selectbox("Jogador", sorted(similarity_index.players), key="similar_defenders")
+    st.caption(f"{player} pertence ao Cluster {similarity_index.cluster_of(player)}")
+    similar = similarity_index.similar_players(player, k=5).rename(columns={'player': 'Jogador', 'cluster': 'Cluster', 'distance': 'Distância'})
+    st.dataframe(similar, hide_index=True, use_container_width=True)
+
 
 
 with tab2:
@@ -380,6 +409,11 @@ with tab2:
     clustered_attackers, kmeans_attackers, X_pca, X_scaled = run_clustering_plotly(rename_for_display(avg_attackers), pca_comp=2, n_clusters=4, role_name="Defenders")
     fig = plot_umap_interactive(clustered_attackers, X_pca, title="UMAP de jogadores Avançados")
 
+    with st.expander("Escolha do número de clusters"):
+        k_sweep = sweep_k(X_scaled)
+        st.plotly_chart(plot_k_selection(k_sweep, chosen_k=4, title="Inércia e silhouette por k - Avançados"), use_container_width=True)
+        st.caption(f"Melhor silhouette com k = {best_k(k_sweep)}. Os perfis abaixo usam k = 4.")
+
     st.plotly_chart(fig, use_container_width=True)
 
     st.write(
@@ -532,3 +566,43 @@ with tab2:
         * Exemplo de perfil: **Riyad Mahrez, Ferran Torres, Cody Gakpo (quando joga nas alas)**
         """)
 
+    st.markdown("<h5 style='text-align: center; color: white;'>Jogadores Semelhantes</h5>", unsafe_allow_html=True)
+    similarity_index = get_similarity_index(rename_for_display(avg_attackers), pca_comp=2, n_clusters=4)
+    player = st.selectbox("Jogador", sorted(similarity_index.players), key="similar_attackers")
+    st.caption(f"{player} pertence ao Cluster {similarity_index.cluster_of(player)}")
+    similar = similarity_index.similar_players(player, k=5).rename(columns={'player': 'Jogador', 'cluster': 'Cluster', 'distance': 'Distância'})
+    st.dataframe(similar, hide_index=True, use_container_width=True)
+
+
+st.markdown("<h2 style='text-align: center; color: white;'>Procura de Jogadores por Perfil</h2>", unsafe_allow_html=True)
+st.write(
+    """
+        Introduza as características desejadas (valores médios por jogo) para ver a que cluster esse perfil corresponde
+        e quais os jogadores mais parecidos com ele.
+    """
+)
+
+profile_role = st.radio("Perfil", ["🛡️ Defesas", "⚔️ Avançados"], horizontal=True)
+role_players = rename_for_display(avg_defenders if profile_role == "🛡️ Defesas" else avg_attackers)
+_, role_features = split_features(role_players)
+
+profile_cols = st.columns(4)
+profile = {
+    col: profile_cols[i % 4].number_input(col, min_value=0.0, value=float(role_features[col].mean()), key=f"profile_{profile_role}_{col}")
+    for i, col in enumerate(role_features.columns)
+}
+
+prediction, profile_scaled = predict_profiles(pd.DataFrame([profile]), role_players, pca_comp=2, n_clusters=4)
+st.markdown(f"<h4 style='text-align: center; color: white;'>Este perfil pertence ao Cluster {prediction['Cluster'].iloc[0]}</h4>", unsafe_allow_html=True)
+
+similarity_index = get_similarity_index(role_players, pca_comp=2, n_clusters=4)
+distances, positions = similarity_index.query(profile_scaled, k=5)
+st.dataframe(
+    pd.DataFrame({
+        'Jogador': similarity_index.players[positions[0]],
+        'Cluster': similarity_index.clusters[positions[0]],
+        'Distância': distances[0],
+    }),
+    hide_index=True,
+    use_container_width=True
+)
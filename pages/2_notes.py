@@ -3,16 +3,6 @@ import streamlit as st
 st.markdown("<h1 style='text-align: center; color: white;'>Trabalho Futuro - Outras Análises que podiam ser feitas</h1>", unsafe_allow_html=True)
 
 
-st.markdown("<h2 style='text-align: center; color: white;'>Ferramenta de Procura de Jogadores</h2>", unsafe_allow_html=True)
-st.write(
-    """
-        Uma possível evolução da dashboard seria criar uma funcionalidade de procura de jogadores personalizada: 
-        o utilizador podia introduzir as características desejadas (ex: muitos remates, boa pressão, presença na área)
-        e a ferramenta indicaria a que cluster esse perfil corresponderia e alguns exemplos de jogadores que 
-        pertencessem a esse grupo.
-    """
-)
-
 st.markdown("<h2 style='text-align: center; color: white;'>Análise Aprofundada de Clusters com Baixa Participação</h2>", unsafe_allow_html=True)
 st.write(
     """
@@ -0,0 +1,136 @@
+import argparse
+import json
+import os
+import threading
+import zlib
+from pathlib import Path
+
+import numpy as np
+
+ARCHIVE_PATH = os.environ.get("STATSBOMB_ARCHIVE")
+
+INDEX_DTYPE = np.dtype([('match_id', '<i8'), ('offset', '<i8'), ('length', '<i8'), ('raw_length', '<i8')])
+
+
+class EventArchive:
+    """Append-only archive of zlib-compressed event files, one blob per match.
+
+    Blobs are concatenated in ``<path>`` and located through the index in
+    ``<path>.idx.npy`` (match_id, offset, length, raw_length), so reading one
+    match is a single ``pread`` plus a decompress. The index is rewritten
+    atomically after each append; bytes written by an interrupted append are
+    simply never referenced.
+    """
+
+    def __init__(self, path=ARCHIVE_PATH, level=6):
+        self.path = Path(path)
+        self.index_path = self.path.with_name(self.path.name + '.idx.npy')
+        self.level = level
+        self._lock = threading.Lock()
+        self._fd = None
+        self._load_index()
+
+    def _load_index(self):
+        try:
+            self.index = np.load(self.index_path)
+        except FileNotFoundError:
+            self.index = np.empty(0, dtype=INDEX_DTYPE)
+        self._positions = {match_id: i for i, match_id in enumerate(self.index['match_id'].tolist())}
+
+    def _write_index(self):
+        tmp = self.index_path.with_name(f"{self.index_path.name}.{os.getpid()}.tmp")
+        with open(tmp, 'wb') as f:
+            np.save(f, self.index)
+        os.replace(tmp, self.index_path)
+
+    def __contains__(self, match_id):
+        return match_id in self._positions
+
+    def __len__(self):
+        return len(self.index)
+
+    def match_ids(self):
+        return self.index['match_id'].tolist()
+
+    def add_many(self, items):
+        # items: iterável de (match_id, bytes do JSON); os jogos já arquivados são ignorados
+        rows, added = [], set()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._lock, open(self.path, 'ab') as f:
+            offset = f.seek(0, os.SEEK_END)
+            for match_id, content in items:
+                if match_id in self._positions or match_id in added:
+                    continue
+                added.add(match_id)
+                blob = zlib.compress(content, self.level)
+                f.write(blob)
+                rows.append((match_id, offset, len(blob), len(content)))
+                offset += len(blob)
+            if not rows:
+                return 0
+            f.flush()
+            os.fsync(f.fileno())
+            self.index = np.concatenate([self.index, np.array(rows, dtype=INDEX_DTYPE)])
+            self._write_index()
+            self._positions.update({row[0]: len(self.index) - len(rows) + i for i, row in enumerate(rows)})
+        return len(rows)
+
+    def add(self, match_id, content):
+        return self.add_many([(match_id, content)]) == 1
+
+    def get_bytes(self, match_id):
+        _, offset, length, _ = self.index[self._positions[match_id]]
+        if self._fd is None:
+            with self._lock:
+                if self._fd is None:
+                    self._fd = os.open(self.path, os.O_RDONLY)
+        # pread não mexe na posição do ficheiro, por isso várias threads podem ler ao mesmo tempo
+        return zlib.decompress(os.pread(self._fd, int(length), int(offset)))
+
+    def get_json(self, match_id):
+        return json.loads(self.get_bytes(match_id))
+
+    def __iter__(self):
+        # Leitura sequencial por ordem de offset, para jobs que percorrem todos os jogos
+        order = np.argsort(self.index['offset'], kind='stable')
+        with open(self.path, 'rb', buffering=1024 * 1024) as f:
+            for match_id, offset, length, _ in self.index[order].tolist():
+                f.seek(offset)
+                yield match_id, json.loads(zlib.decompress(f.read(length)))
+
+    def stats(self):
+        return {
+            'matches': len(self.index),
+            'bytes': int(self.index['length'].sum()),
+            'raw_bytes': int(self.index['raw_length'].sum()),
+        }
+
+    def close(self):
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+
+def archive_mirror(mirror, path, level=6, batch=64):
+    # Empacota todos os data/events/*.json de um checkout do open-data
+    archive = EventArchive(path, level)
+    files = sorted(Path(mirror, 'data', 'events').glob('*.json'))
+    for start in range(0, len(files), batch):
+        archive.add_many((int(file.stem), file.read_bytes()) for file in files[start:start + batch])
+    return archive
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cria um arquivo comprimido com os eventos de um checkout do open-data")
+    parser.add_argument('mirror')
+    parser.add_argument('--out', required=True)
+    parser.add_argument('--level', type=int, default=6)
+    args = parser.parse_args()
+
+    stats = archive_mirror(args.mirror, args.out, args.level).stats()
+    ratio = stats['raw_bytes'] / stats['bytes'] if stats['bytes'] else 0
+    print(f"{stats['matches']} matches, {stats['raw_bytes'] / 2 ** 20:.1f} MiB -> {stats['bytes'] / 2 ** 20:.1f} MiB ({ratio:.1f}x)")
+
+
+if __name__ == '__main__':
+    main()
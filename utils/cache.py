@@ -0,0 +1,151 @@
+import functools
+import hashlib
+import os
+import threading
+import time
+import types
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+APP_CACHE_MAX_ENTRIES = int(os.environ.get("APP_CACHE_MAX_ENTRIES", 128))
+APP_CACHE_TTL = float(os.environ.get("APP_CACHE_TTL", 3600))
+
+
+def _update(digest, value):
+    if isinstance(value, pd.DataFrame):
+        digest.update(b"df")
+        digest.update(repr((list(value.columns), [str(t) for t in value.dtypes])).encode())
+        digest.update(pd.util.hash_pandas_object(value, index=True).to_numpy().tobytes())
+    elif isinstance(value, pd.Series):
+        digest.update(b"series")
+        digest.update(repr((value.name, str(value.dtype))).encode())
+        digest.update(pd.util.hash_pandas_object(value, index=True).to_numpy().tobytes())
+    elif isinstance(value, np.ndarray):
+        digest.update(b"array")
+        digest.update(repr((value.shape, str(value.dtype))).encode())
+        if value.dtype == object:
+            digest.update(pd.util.hash_array(value.ravel()).tobytes())
+        else:
+            digest.update(np.ascontiguousarray(value).tobytes())
+    elif isinstance(value, dict):
+        digest.update(b"dict")
+        for key in sorted(value, key=repr):
+            _update(digest, key)
+            _update(digest, value[key])
+    elif isinstance(value, (list, tuple)):
+        digest.update(type(value).__name__.encode())
+        for item in value:
+            _update(digest, item)
+    elif value is None or isinstance(value, (bool, int, float, complex, str, bytes, np.generic)):
+        digest.update(repr(value).encode())
+    elif hasattr(type(value), '__fingerprint__'):
+        # Objetos que declaram o seu conteúdo (ex: CorrelationAccumulator); o repr por omissão tem o endereço em memória
+        digest.update(f"{type(value).__module__}.{type(value).__qualname__}".encode())
+        _update(digest, value.__fingerprint__())
+    elif isinstance(value, (types.FunctionType, types.BuiltinFunctionType, type)):
+        # Funções de módulo pelo nome; lambdas e closures têm o mesmo nome com comportamentos diferentes
+        name = value.__qualname__
+        if '<lambda>' in name or '<locals>' in name or getattr(value, '__closure__', None):
+            raise TypeError(f"cannot fingerprint {name}: pass a module-level function")
+        digest.update(f"callable:{value.__module__}.{name}".encode())
+    else:
+        raise TypeError(f"cannot fingerprint {type(value).__qualname__} values")
+
+
+def fingerprint(*values):
+    # Hash estável do conteúdo dos argumentos (dados + parâmetros)
+    digest = hashlib.sha256()
+    for value in values:
+        _update(digest, value)
+    return digest.hexdigest()
+
+
+def _copy(value):
+    # Os DataFrames devolvidos são cópias, para que quem chama possa alterá-los
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return value.copy()
+    if isinstance(value, tuple):
+        return tuple(_copy(item) for item in value)
+    return value
+
+
+class ResultCache:
+    """LRU cache of function results shared by every page in the process."""
+
+    def __init__(self, max_entries=APP_CACHE_MAX_ENTRIES, ttl=APP_CACHE_TTL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.time_saved = 0.0
+        self._entries = OrderedDict()
+        self._lock = threading.RLock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, created, compute_time = entry
+            if self.ttl is not None and time.time() - created > self.ttl:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            self.time_saved += compute_time
+            return entry
+
+    def set(self, key, value, compute_time):
+        with self._lock:
+            self.misses += 1
+            self._entries[key] = (value, time.time(), compute_time)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def stats(self):
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'time_saved': self.time_saved,
+            'entries': len(self._entries),
+        }
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+result_cache = ResultCache()
+
+
+def cached(fn):
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        key = (fn.__module__, fn.__qualname__, fingerprint(args, kwargs))
+        entry = result_cache.get(key)
+        if entry is not None:
+            return _copy(entry[0])
+
+        start = time.perf_counter()
+        value = fn(*args, **kwargs)
+        result_cache.set(key, value, time.perf_counter() - start)
+        return _copy(value)
+
+    return wrapper
+
+
+def render_cache_panel():
+    import streamlit as st
+
+    stats = result_cache.stats()
+    with st.sidebar.expander("Cache", expanded=False):
+        col1, col2 = st.columns(2)
+        col1.metric("Hits", stats['hits'])
+        col2.metric("Misses", stats['misses'])
+        st.metric("Tempo poupado", f"{stats['time_saved']:.1f} s")
+        st.caption(f"{stats['entries']} resultados guardados (máx. {result_cache.max_entries}, TTL {result_cache.ttl:.0f} s)")
+        if st.button("Limpar cache"):
+            result_cache.clear()
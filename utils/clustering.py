@@ -1,36 +1,47 @@
 import pandas as pd
 import numpy as np
-import plotly.express as px
 import plotly.graph_objects as go
+from plotly.subplots import make_subplots
 
-from sklearn.preprocessing import StandardScaler
-from sklearn.preprocessing import MinMaxScaler
-from sklearn.decomposition import PCA
-from sklearn.cluster import KMeans
-import umap.umap_ as umap
+# plotly.express, sklearn e umap (que arrasta o numba) são importados dentro das funções que os usam:
+# importá-los aqui custava vários segundos no arranque de cada página, mesmo quando os modelos vêm da cache
 
+from utils.correlation import CorrelationAccumulator
+from utils.feature_store import combine_aggregates, finalize_aggregates, partial_aggregates
+from utils.fetch import BASE_URL, get_fetcher
+from utils.model_store import model_store
+from utils.similarity import SimilarityIndex
+from utils.tracing import traced
 
-from utils.individual_match import get_data
-
+@traced
 def get_matches_df(competition_id: int, season_id: int):
-    url_matches = f"https://raw.githubusercontent.com/statsbomb/open-data/master/data/matches/{competition_id}/{season_id}.json"
-    data = get_data(url_matches)
+    url_matches = f"{BASE_URL}data/matches/{competition_id}/{season_id}.json"
+    data = get_fetcher().get_json(url_matches)
     matches = pd.json_normalize(data)
     return matches
 
+@traced
 def aggregate_player_metrics(df):
-    id_cols = ['player_name', 'team', 'role', 'gender']
+    # Aceita um DataFrame ou um iterador de DataFrames (ex: pd.read_csv(..., chunksize=...))
+    chunks = [df] if isinstance(df, pd.DataFrame) else df
 
-    df = df.drop('match_id', axis=1)
+    aggregates = None
+    for chunk in chunks:
+        aggregates = combine_aggregates(aggregates, partial_aggregates(chunk))
 
-    grouped = df.groupby('player_name')
-    meta = grouped[id_cols[1:]].agg(lambda x: x.mode()[0])
-    metrics = grouped.mean(numeric_only=True)
+    return finalize_aggregates(aggregates)
 
-    return meta.join(metrics, on='player_name').reset_index()
+@traced
+def plot_correlation_heatmap(df, title, labels_map=None):
+    # Aceita a tabela ou um CorrelationAccumulator já atualizado (ex: o da FeatureStore)
+    import plotly.express as px
 
-def plot_correlation_heatmap(df, title):
-    corr_matrix = df.select_dtypes(include=np.number).corr()
+    if isinstance(df, CorrelationAccumulator):
+        corr_matrix = df.corr()
+    else:
+        corr_matrix = df.select_dtypes(include=np.number).corr()
+    if labels_map:
+        corr_matrix = corr_matrix.rename(index=labels_map, columns=labels_map)
 
     mask = np.tril(np.ones(corr_matrix.shape)).astype(bool)
     corr_matrix_masked = corr_matrix.where(mask)
@@ -76,14 +87,46 @@ column_labels_pt = {
 def rename_for_display(df, col_map=column_labels_pt):
     return df.rename(columns=col_map)
 
-def plot_metric_histograms(df, title=None, labels_map=column_labels_pt):
+def histogram_counts(df, nbins=10):
+    # Contagens de todas as colunas numa só passagem: cada valor é convertido no índice do seu bin
+    # (deslocado por coluna) e um único bincount conta tudo
+    X = df.to_numpy(dtype=np.float64)
+    low, high = np.nanmin(X, axis=0), np.nanmax(X, axis=0)
+    width = np.where(high > low, (high - low) / nbins, 1.0)
+
+    valid = ~np.isnan(X)
+    bins = np.clip(((np.where(valid, X, low) - low) / width).astype(np.int64), 0, nbins - 1)
+    bins += np.arange(X.shape[1]) * nbins
+    counts = np.bincount(bins[valid], minlength=X.shape[1] * nbins).reshape(X.shape[1], nbins)
+
+    edges = low[:, None] + width[:, None] * np.arange(nbins + 1)
+    return counts, edges
+
+@traced
+def plot_metric_histograms(df, title=None, labels_map=column_labels_pt, mode="bars", nbins=10):
+    # mode="bars" envia só as contagens de cada bin (o tamanho da figura não depende do nº de jogadores);
+    # mode="raw" usa o px.histogram, que envia a coluna inteira para o browser
+    import plotly.express as px
+
     exclude = {'player_name', 'team', 'role', 'gender'}
     numeric_cols = [col for col in df.columns if col not in exclude]
     plots = []
-    
-    for col in numeric_cols:
+
+    if mode == "bars":
+        counts, edges = histogram_counts(df[numeric_cols], nbins)
+
+    for i, col in enumerate(numeric_cols):
         label = labels_map.get(col, col) if labels_map else col
-        fig = px.histogram(df, x=col, nbins=10, title=label)
+        if mode == "bars":
+            centers = (edges[i, :-1] + edges[i, 1:]) / 2
+            fig = go.Figure(go.Bar(
+                x=centers, y=counts[i], width=edges[i, 1] - edges[i, 0],
+                customdata=np.column_stack([edges[i, :-1], edges[i, 1:]]),
+                hovertemplate='%{customdata[0]:.3g} – %{customdata[1]:.3g}<br>%{y}<extra></extra>',
+            ))
+            fig.update_layout(title=label, bargap=0)
+        else:
+            fig = px.histogram(df, x=col, nbins=nbins, title=label)
         fig.update_layout(
             xaxis_title=label,
             yaxis_title='Percentagem' if label == 'Percentagem de Passes Bem Sucedidos' else 'Nº de vezes',
@@ -94,7 +137,32 @@ def plot_metric_histograms(df, title=None, labels_map=column_labels_pt):
     
     return plots
 
-def run_clustering_plotly(df, pca_comp=2, n_clusters=4, role_name="Attackers", labels_map=column_labels_pt):
+@traced
+def fit_clustering(df_numeric, pca_comp=2, n_clusters=4, random_state=42):
+    # Os modelos ajustados ficam guardados em disco; só se volta a ajustar quando os dados ou parâmetros mudam
+    key = model_store.key('clustering', df_numeric, pca_comp=pca_comp, n_clusters=n_clusters, random_state=random_state)
+
+    def fit():
+        from sklearn.cluster import KMeans
+        from sklearn.decomposition import PCA
+        from sklearn.preprocessing import StandardScaler
+
+        # Standardize features
+        scaler = StandardScaler()
+        X_scaled = scaler.fit_transform(df_numeric)
+
+        pca = PCA(n_components=pca_comp)
+        X_pca = pca.fit_transform(X_scaled)
+
+        kmeans = KMeans(n_clusters=n_clusters, random_state=random_state)
+        labels = kmeans.fit_predict(X_scaled)
+
+        return {'scaler': scaler, 'pca': pca, 'kmeans': kmeans, 'labels': labels, 'X_pca': X_pca, 'X_scaled': X_scaled}
+
+    return model_store.get_or_fit(key, fit)
+
+@traced
+def run_clustering_plotly(df, pca_comp=2, n_clusters=4, role_name="Attackers", labels_map=column_labels_pt, random_state=42):
     if labels_map:
         players = df['Jogador'].values
         teams = df['Equipa'].values if 'Equipa' in df.columns else ['Unknown'] * len(df)
@@ -109,15 +177,8 @@ def run_clustering_plotly(df, pca_comp=2, n_clusters=4, role_name="Attackers", l
         genders = df['gender'].values if 'gender' in df.columns else ['Unknown'] * len(df)
         df_numeric = df.drop(columns=['player_name', 'team', 'role', "gender"], errors='ignore')
 
-    # Standardize features
-    scaler = StandardScaler()
-    X_scaled = scaler.fit_transform(df_numeric)
-
-    pca = PCA(n_components=pca_comp)
-    X_pca = pca.fit_transform(X_scaled)
-
-    kmeans = KMeans(n_clusters=n_clusters, random_state=42)
-    labels = kmeans.fit_predict(X_scaled)
+    model = fit_clustering(df_numeric, pca_comp=pca_comp, n_clusters=n_clusters, random_state=random_state)
+    kmeans, labels, X_pca, X_scaled = model['kmeans'], model['labels'], model['X_pca'], model['X_scaled']
 
     if labels_map:
         cluster_df = pd.DataFrame({
@@ -140,27 +201,121 @@ def run_clustering_plotly(df, pca_comp=2, n_clusters=4, role_name="Attackers", l
 
     return cluster_df, kmeans, X_pca, X_scaled
 
-def plot_umap_interactive(df, X_pca, title="UMAP"):
-    for i in ["player_name", "team", "role", "gender", "Jogador", "Equipa", "Posição", "Género"]:
-        if i in df.columns:
-            features = df.drop(columns=i, errors='ignore')
-
-    reducer = umap.UMAP(n_components=2, random_state=42)
-    embedding = reducer.fit_transform(X_pca)
-
-    if 'player_name' in df.columns:
-        plot_df = df[["player_name", "team", "role", "gender"]].copy()
+def split_features(df, labels_map=column_labels_pt):
+    player_col = 'Jogador' if labels_map else 'player_name'
+    id_cols = ['Jogador', 'Equipa', 'Posição', 'Género'] if labels_map else ['player_name', 'team', 'role', 'gender']
+    return df[player_col].astype(str).to_numpy(), df.drop(columns=id_cols, errors='ignore')
+
+@traced
+def predict_profiles(profiles, df, pca_comp=2, n_clusters=4, labels_map=column_labels_pt, random_state=42):
+    # Atribui perfis (em unidades das métricas) aos clusters já ajustados, sem voltar a treinar
+    _, df_numeric = split_features(df, labels_map)
+    model = fit_clustering(df_numeric, pca_comp=pca_comp, n_clusters=n_clusters, random_state=random_state)
+
+    if isinstance(profiles, pd.DataFrame):
+        profiles = profiles[df_numeric.columns]
+    X = np.atleast_2d(np.asarray(profiles, dtype=np.float64))
+    X_scaled = model['scaler'].transform(pd.DataFrame(X, columns=df_numeric.columns))
+    distances = model['kmeans'].transform(X_scaled)
+    X_pca = model['pca'].transform(X_scaled)
+
+    result = pd.DataFrame({'Cluster': distances.argmin(axis=1)})
+    for i in range(distances.shape[1]):
+        result[f'Distância Cluster {i}'] = distances[:, i]
+    for i in range(X_pca.shape[1]):
+        result[f'PCA{i+1}'] = X_pca[:, i]
+    return result, X_scaled
+
+@traced
+def get_similarity_index(df, pca_comp=2, n_clusters=4, labels_map=column_labels_pt, random_state=42):
+    # Índice de vizinhos sobre as mesmas features standardizadas do clustering, guardado junto do scaler
+    players, df_numeric = split_features(df, labels_map)
+
+    model = fit_clustering(df_numeric, pca_comp=pca_comp, n_clusters=n_clusters, random_state=random_state)
+    key = model_store.key('similarity', df_numeric, players=players, n_clusters=n_clusters, random_state=random_state)
+
+    def build():
+        return {'scaler': model['scaler'], 'index': SimilarityIndex(model['X_scaled'], model['labels'], players)}
+
+    return model_store.get_or_fit(key, build)['index']
+
+@traced
+def fit_umap(X_pca, random_state=42):
+    key = model_store.key('umap', X_pca, n_components=2, random_state=random_state)
+
+    def fit():
+        import umap.umap_ as umap
+
+        reducer = umap.UMAP(n_components=2, random_state=random_state)
+        return {'embedding': reducer.fit_transform(X_pca)}
+
+    return model_store.get_or_fit(key, fit)['embedding']
+
+# Acima destes limites o SVG deixa de ser utilizável no browser
+UMAP_WEBGL_THRESHOLD = 5_000
+UMAP_DENSITY_THRESHOLD = 100_000
+UMAP_SAMPLE_PER_CLUSTER = 300
+
+def density_tiles(embedding, n_tiles=200):
+    # Contagem de jogadores por quadrícula, com um único bincount sobre o índice da quadrícula
+    low, high = embedding.min(axis=0), embedding.max(axis=0)
+    size = np.where(high > low, (high - low) / n_tiles, 1.0)
+    tiles = np.clip(((embedding - low) / size).astype(np.int64), 0, n_tiles - 1)
+    counts = np.bincount(tiles[:, 1] * n_tiles + tiles[:, 0], minlength=n_tiles * n_tiles).reshape(n_tiles, n_tiles)
+    x = low[0] + size[0] * (np.arange(n_tiles) + 0.5)
+    y = low[1] + size[1] * (np.arange(n_tiles) + 0.5)
+    return x, y, counts
+
+def sample_per_cluster(clusters, n_per_cluster, random_state=42):
+    # Amostra estratificada: até n_per_cluster jogadores de cada cluster, sempre os mesmos para a mesma seed
+    rng = np.random.default_rng(random_state)
+    order = rng.permutation(len(clusters))
+    ranked = pd.Series(clusters[order]).groupby(clusters[order]).cumcount().to_numpy()
+    return np.sort(order[ranked < n_per_cluster])
+
+@traced
+def plot_umap_interactive(df, X_pca, title="UMAP", random_state=42, mode=None):
+    # mode: "svg", "webgl" ou "density"; por omissão é escolhido pelo nº de jogadores
+    import plotly.express as px
+
+    embedding = fit_umap(X_pca, random_state=random_state)
+    if mode is None:
+        mode = "svg" if len(df) <= UMAP_WEBGL_THRESHOLD else "webgl" if len(df) <= UMAP_DENSITY_THRESHOLD else "density"
+
+    hover_cols = ["player_name", "team", "gender"] if 'player_name' in df.columns else ["Jogador", "Equipa", "Posição", "Género"]
+
+    if mode == "density":
+        # Só as contagens por quadrícula e uma amostra de cada cluster (com hover) vão para o browser
+        x, y, counts = density_tiles(embedding)
+        clusters = df['Cluster'].to_numpy()
+        sample = sample_per_cluster(clusters, UMAP_SAMPLE_PER_CLUSTER, random_state)
+
+        fig = go.Figure(go.Heatmap(
+            x=x, y=y, z=np.where(counts > 0, np.log1p(counts).round(2), np.nan), customdata=counts,
+            colorscale='Greys', reversescale=True, showscale=False, hoverongaps=False,
+            hovertemplate='%{customdata} jogadores<extra></extra>',
+        ))
+        customdata = df[hover_cols].iloc[sample].astype(str).to_numpy()
+        fig.add_trace(go.Scattergl(
+            x=embedding[sample, 0], y=embedding[sample, 1], mode='markers', customdata=customdata,
+            marker=dict(size=5, color=clusters[sample], colorscale='Plasma', colorbar=dict(title='cluster')),
+            hovertemplate='<br>'.join(f'{col}=%{{customdata[{i}]}}' for i, col in enumerate(hover_cols))
+                + '<br>cluster=%{marker.color}<extra></extra>',
+        ))
+        fig.update_layout(title=title, xaxis_title="UMAP1", yaxis_title="UMAP2")
     else:
-        plot_df = df[["Jogador", "Equipa", "Posição", "Género"]].copy()
-    plot_df["UMAP1"] = embedding[:, 0]
-    plot_df["UMAP2"] = embedding[:, 1]
-    plot_df["cluster"] = df['Cluster']
-
-    fig = px.scatter(
-        plot_df, x="UMAP1", y="UMAP2", color=plot_df.cluster, labels={'color': 'cluster'},
-        hover_data=["player_name", "team", "gender"] if 'player_name' in df.columns else ["Jogador", "Equipa", "Posição", "Género"],
-        title=title
-    )
+        if 'player_name' in df.columns:
+            plot_df = df[["player_name", "team", "role", "gender"]].copy()
+        else:
+            plot_df = df[["Jogador", "Equipa", "Posição", "Género"]].copy()
+        plot_df["UMAP1"] = embedding[:, 0]
+        plot_df["UMAP2"] = embedding[:, 1]
+        plot_df["cluster"] = df['Cluster']
+
+        fig = px.scatter(
+            plot_df, x="UMAP1", y="UMAP2", color=plot_df.cluster, labels={'color': 'cluster'},
+            hover_data=hover_cols, title=title, render_mode="webgl" if mode == "webgl" else "svg",
+        )
     fig.update_layout(
         width=800, 
         height=600,
@@ -170,7 +325,29 @@ def plot_umap_interactive(df, X_pca, title="UMAP"):
     )
     return fig
 
+@traced
+def plot_k_selection(sweep, chosen_k=None, title="Escolha do número de clusters"):
+    fig = make_subplots(specs=[[{"secondary_y": True}]])
+    fig.add_trace(go.Scatter(x=sweep['k'], y=sweep['inertia'], mode='lines+markers', name='Inércia'), secondary_y=False)
+    fig.add_trace(go.Scatter(x=sweep['k'], y=sweep['silhouette'], mode='lines+markers', name='Silhouette'), secondary_y=True)
+    if chosen_k is not None:
+        fig.add_vline(x=chosen_k, line_dash='dash', line_color='white')
+
+    fig.update_layout(
+        title=title,
+        xaxis=dict(title='Nº de clusters (k)', dtick=1),
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)',
+        height=400
+    )
+    fig.update_yaxes(title_text='Inércia', secondary_y=False)
+    fig.update_yaxes(title_text='Silhouette', secondary_y=True)
+    return fig
+
+@traced
 def plot_radar_chart(df,features):
+    from sklearn.preprocessing import MinMaxScaler
+
     minmax_scaler = MinMaxScaler()
     normalized_values = minmax_scaler.fit_transform(df[features])
     normalized_df = pd.DataFrame(normalized_values, columns=features)
@@ -222,7 +399,10 @@ def plot_radar_chart(df,features):
   )
     return fig
 
+@traced
 def plot_size(df):
+    import plotly.express as px
+
     counts = df.groupby('Cluster')['Jogador'].count().reset_index()
     counts.columns = ['cluster', 'counts']
 
@@ -251,7 +431,10 @@ def plot_size(df):
     )
     return fig_bar
 
+@traced
 def plot_gender_distribution(df, cluster_col='Cluster', gender_col='gender'):
+    import plotly.express as px
+
     counts = df.groupby([cluster_col, gender_col]).size().reset_index(name='count')
 
     totals = counts.groupby(cluster_col)['count'].transform('sum')
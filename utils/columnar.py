@@ -0,0 +1,162 @@
+import contextlib
+import fcntl
+import json
+import os
+import shutil
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+SCHEMA_FILE = "schema.json"
+
+
+def _smallest_int(values):
+    for dtype in (np.int8, np.int16, np.int32):
+        info = np.iinfo(dtype)
+        if len(values) == 0 or (values.min() >= info.min and values.max() <= info.max):
+            return dtype
+    return np.int64
+
+
+def _float_dtype(values, float_dtype):
+    # float32 só quando a conversão não perde precisão, a não ser que seja pedido explicitamente
+    if float_dtype is not None:
+        return float_dtype
+    as_float32 = values.astype(np.float32)
+    if np.array_equal(as_float32.astype(values.dtype), values, equal_nan=True):
+        return np.float32
+    return np.float64
+
+
+@contextlib.contextmanager
+def _writer_lock(path):
+    # Um escritor de cada vez por tabela (threads ou processos); os leitores não precisam do lock
+    with open(path.with_name(f".{path.name}.lock"), 'w') as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def _swap(path, version):
+    # path é um symlink para a versão atual; trocar o symlink com os.replace é atómico
+    link = path.with_name(f"{version.name}.link")
+    os.symlink(version.name, link)
+    if path.exists() and not path.is_symlink():
+        # Formato antigo: a tabela era escrita diretamente na pasta
+        old = path.with_name(f"{version.name}.old")
+        os.replace(path, old)
+    os.replace(link, path)
+
+    # Com o lock não há outra escrita a meio, por isso tudo o que não é a versão atual pode ser apagado
+    for sibling in path.parent.glob(f".{path.name}.*"):
+        if sibling.name not in (version.name, f".{path.name}.lock"):
+            if sibling.is_dir() and not sibling.is_symlink():
+                shutil.rmtree(sibling, ignore_errors=True)
+            else:
+                sibling.unlink(missing_ok=True)
+
+
+def write_table(df, path, float_dtype=None, meta=None):
+    """Writes ``df`` as one ``.npy`` file per column plus a JSON schema.
+
+    Text columns are dictionary-encoded (integer codes + categories), integer
+    columns use the smallest type that fits and float columns are stored as
+    float32 whenever that is exact. Pass ``float_dtype=np.float32`` to force it.
+    Each write goes to a new directory and ``path`` is a symlink swapped to it
+    atomically, so readers never see a partly written table. Writers to the
+    same path are serialised with a lock file. ``meta`` is stored as is in the
+    schema and read back with ``read_meta``.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with _writer_lock(path):
+        _write_version(df, path, float_dtype, meta)
+
+
+def _write_version(df, path, float_dtype, meta):
+    version = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.{time.time_ns()}")
+    version.mkdir()
+    schema = []
+
+    try:
+        for i, (name, column) in enumerate(df.items()):
+            file_name = f"{i}.npy"
+            if pd.api.types.is_numeric_dtype(column) and not pd.api.types.is_bool_dtype(column):
+                values = column.to_numpy()
+                if pd.api.types.is_integer_dtype(column):
+                    values = values.astype(_smallest_int(values))
+                else:
+                    values = values.astype(_float_dtype(values, float_dtype))
+                schema.append({'name': name, 'file': file_name, 'kind': 'numeric'})
+            else:
+                codes, categories = pd.factorize(column, sort=True)
+                values = codes.astype(_smallest_int(codes))
+                schema.append({'name': name, 'file': file_name, 'kind': 'category', 'categories': categories.tolist()})
+            np.save(version / file_name, values)
+
+        (version / SCHEMA_FILE).write_text(json.dumps({'rows': len(df), 'columns': schema, 'meta': meta}, ensure_ascii=False))
+        _swap(path, version)
+    except BaseException:
+        shutil.rmtree(version, ignore_errors=True)
+        raise
+
+
+def _read_version(path, mode):
+    schema = json.loads((path / SCHEMA_FILE).read_text())
+    columns = {}
+    for column in schema['columns']:
+        values = np.load(path / column['file'], mmap_mode=mode)
+        if column['kind'] == 'category':
+            values = pd.Categorical.from_codes(values, categories=column['categories'])
+        columns[column['name']] = values
+    return pd.DataFrame(columns, copy=False)
+
+
+def read_table(path, mmap=True, attempts=3):
+    # Os arrays numéricos são mapeados em memória sem cópia ('c': copy-on-write, o frame pode ser alterado
+    # sem mexer nos ficheiros); o texto fica como Categorical
+    mode = 'c' if mmap else None
+    for attempt in range(attempts):
+        # Tudo é lido da mesma versão; se outra escrita a apagar a meio, lê-se a nova
+        try:
+            return _read_version(Path(path).resolve(), mode)
+        except FileNotFoundError:
+            if attempt == attempts - 1:
+                raise
+
+
+def read_meta(path):
+    # O meta gravado com write_table, ou None (tabela sem meta ou inexistente)
+    try:
+        return json.loads((Path(path) / SCHEMA_FILE).read_text()).get('meta')
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def table_path(csv_path):
+    return Path(csv_path).with_suffix('.cols')
+
+
+def convert_csv(csv_path, float_dtype=None):
+    df = pd.read_csv(csv_path)
+    write_table(df, table_path(csv_path), float_dtype=float_dtype)
+    return df
+
+
+def read_player_table(csv_path):
+    # Usa a versão colunar quando existe e está atualizada; caso contrário gera-a a partir do CSV
+    path = table_path(csv_path)
+    schema = path / SCHEMA_FILE
+    try:
+        if schema.exists() and schema.stat().st_mtime >= Path(csv_path).stat().st_mtime:
+            return read_table(path)
+        convert_csv(csv_path)
+        return read_table(path)
+    except OSError:
+        # Sem permissão de escrita, ou a tabela foi substituída por outra sessão a meio da leitura
+        return pd.read_csv(csv_path)
@@ -0,0 +1,87 @@
+import numpy as np
+import pandas as pd
+
+
+class CorrelationAccumulator:
+    """Running pairwise-complete correlation matrix, updated one batch of rows at a time.
+
+    For every pair of columns (i, j) it keeps, over the rows where both are
+    present, the count, the mean of i, the sum of squared deviations of i and
+    the co-moment of i and j. Batches are merged with Chan et al.'s parallel
+    update, so accumulators built on different chunks or processes can be
+    combined with ``merge`` and give the same result as ``DataFrame.corr()``.
+    """
+
+    def __init__(self, columns=None):
+        self.columns = None if columns is None else list(columns)
+        self.n = self.mean = self.m2 = self.comoment = None
+
+    def __fingerprint__(self):
+        # Conteúdo usado por utils.cache.fingerprint para as chaves da cache
+        return self.columns, self.n, self.mean, self.m2, self.comoment
+
+    def _empty(self, n_columns):
+        shape = (n_columns, n_columns)
+        self.n, self.mean, self.m2, self.comoment = (np.zeros(shape) for _ in range(4))
+
+    @staticmethod
+    def _moments(X):
+        # Momentos de um lote; centrar antes pela média de cada coluna evita o cancelamento das somas
+        present = ~np.isnan(X)
+        shift = np.zeros(X.shape[1])
+        counts = present.sum(axis=0)
+        np.divide(np.nansum(X, axis=0), counts, out=shift, where=counts > 0)
+        Xc = np.where(present, X - shift, 0.0)
+        M = present.astype(np.float64)
+
+        n = M.T @ M
+        sums = Xc.T @ M  # sums[i, j]: soma de x_i nas linhas em que j também existe
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean = np.where(n > 0, sums / n, 0.0)
+        m2 = (Xc ** 2).T @ M - mean * sums
+        comoment = Xc.T @ Xc - mean * sums.T
+        return n, mean + shift[:, None], m2, comoment
+
+    def _combine(self, n_b, mean_b, m2_b, comoment_b):
+        n_a, mean_a = self.n, self.mean
+        n = n_a + n_b
+        with np.errstate(invalid='ignore', divide='ignore'):
+            weight = np.where(n > 0, n_a * n_b / n, 0.0)
+            delta = mean_b - mean_a
+            self.mean = np.where(n > 0, mean_a + delta * np.where(n > 0, n_b / n, 0.0), 0.0)
+        self.m2 = self.m2 + m2_b + delta ** 2 * weight
+        self.comoment = self.comoment + comoment_b + delta * delta.T * weight
+        self.n = n
+
+    def update(self, df):
+        if self.columns is None:
+            self.columns = list(df.select_dtypes(include=np.number).columns)
+        X = df.reindex(columns=self.columns).to_numpy(dtype=np.float64, na_value=np.nan)
+        if self.n is None:
+            self._empty(len(self.columns))
+        if len(X):
+            self._combine(*self._moments(X))
+        return self
+
+    def merge(self, other):
+        if other.n is None:
+            return self
+        if self.n is None:
+            self.columns = list(other.columns)
+            self._empty(len(self.columns))
+        if other.columns != self.columns:
+            raise ValueError("accumulators have different columns")
+        self._combine(other.n, other.mean, other.m2, other.comoment)
+        return self
+
+    def corr(self):
+        if self.n is None:
+            return pd.DataFrame(index=self.columns, columns=self.columns, dtype=np.float64)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            corr = self.comoment / np.sqrt(self.m2 * self.m2.T)
+        # Como no pandas: NaN sem pares suficientes ou com variância nula, 1 na diagonal
+        corr[(self.n < 2) | (self.m2 <= 0) | (self.m2.T <= 0)] = np.nan
+        corr = np.clip(corr, -1, 1)
+        diagonal = np.diag(self.n) >= 2
+        np.fill_diagonal(corr, np.where(diagonal & (np.diag(self.m2) > 0), 1.0, np.nan))
+        return pd.DataFrame(corr, index=self.columns, columns=self.columns)
@@ -0,0 +1,167 @@
+import argparse
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from utils.fetch import BASE_URL, DiskCache
+
+RETRY_STATUS = (429, 500, 502, 503, 504)
+
+
+class RateLimiter:
+    """Token bucket shared by the download threads (``rate`` requests per second)."""
+
+    def __init__(self, rate=None, burst=None):
+        self.rate = rate
+        self.capacity = burst or (rate or 1)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        if not self.rate:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+def event_url(match_id, base_url=BASE_URL):
+    return f"{base_url}data/events/{match_id}.json"
+
+
+def make_session(workers):
+    # Uma ligação por thread, reutilizada entre pedidos; os retries são feitos à mão em fetch_with_retry
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=workers, max_retries=0)
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def fetch_with_retry(session, url, limiter, retries=5, backoff=0.5, timeout=30):
+    for attempt in range(retries + 1):
+        limiter.acquire()
+        try:
+            response = session.get(url, timeout=timeout)
+        except requests.RequestException as exc:
+            # URLs inválidos (MissingSchema, InvalidURL, ...) não melhoram com retries
+            if isinstance(exc, ValueError):
+                raise
+            # Inclui ligações cortadas a meio do corpo (ChunkedEncodingError), não só ConnectionError/Timeout
+            error, retry_after = exc, None
+        else:
+            if response.status_code not in RETRY_STATUS:
+                response.raise_for_status()
+                return response.content
+            error = requests.HTTPError(f"{response.status_code} for {url}", response=response)
+            retry_after = response.headers.get("Retry-After")
+
+        if attempt == retries:
+            raise error
+        # Backoff exponencial com jitter, ou o Retry-After do servidor quando existe
+        delay = float(retry_after) if retry_after and retry_after.isdigit() else backoff * 2 ** attempt
+        time.sleep(delay * (0.5 + random.random()))
+
+
+def download_events(match_ids, cache=None, base_url=BASE_URL, mirror=None, workers=16, rate=None, retries=5,
+                    backoff=0.5, timeout=30, progress=None):
+    """Downloads events/{match_id}.json for every match into the disk cache.
+
+    Files are fetched from ``base_url`` but stored under the canonical
+    ``BASE_URL`` key, so ``get_data`` finds them whatever the source was.
+
+    Matches already in the cache (or in the local mirror) are skipped, so an
+    interrupted run can simply be started again. ``progress`` is called as
+    ``progress(done, total, match_id, error)`` after each download.
+    """
+    cache = cache if cache is not None else DiskCache()
+    mirror = Path(mirror) if mirror else None
+
+    match_ids = list(dict.fromkeys(match_ids))
+    pending = []
+    for match_id in match_ids:
+        # Descarrega de base_url, mas guarda com o URL canónico, que é o que o Fetcher procura na cache
+        key = event_url(match_id)
+        if mirror is not None and (mirror / key[len(BASE_URL):]).is_file():
+            continue
+        if not cache.contains(key):
+            pending.append((match_id, event_url(match_id, base_url), key))
+
+    summary = {'requested': len(match_ids), 'skipped': len(match_ids) - len(pending), 'downloaded': 0, 'bytes': 0, 'failed': {}}
+    if not pending:
+        summary['seconds'] = 0.0
+        return summary
+
+    session = make_session(workers)
+    limiter = RateLimiter(rate)
+
+    def download(url, key):
+        content = fetch_with_retry(session, url, limiter, retries, backoff, timeout)
+        cache.set(key, content, evict=False)
+        return len(content)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(workers) as pool:
+        futures = {pool.submit(download, url, key): match_id for match_id, url, key in pending}
+        for done, future in enumerate(as_completed(futures), start=1):
+            match_id = futures[future]
+            error = future.exception()
+            if error is None:
+                summary['downloaded'] += 1
+                summary['bytes'] += future.result()
+            else:
+                summary['failed'][match_id] = repr(error)
+            if progress is not None:
+                progress(done, len(pending), match_id, error)
+    session.close()
+    # Evicção uma única vez no fim, em vez de a cada ficheiro escrito
+    cache.evict()
+
+    summary['seconds'] = time.perf_counter() - start
+    return summary
+
+
+def print_progress(done, total, match_id, error):
+    status = f"falhou: {error}" if error is not None else "ok"
+    print(f"[{done}/{total}] {match_id} {status}", flush=True)
+
+
+def main():
+    from utils.match_index import MatchIndex
+
+    parser = argparse.ArgumentParser(description="Descarrega para a cache os eventos de todos os jogos de uma ou mais épocas")
+    parser.add_argument('seasons', nargs='+', help="pares competition_id:season_id, ex: 37:90 2:27")
+    parser.add_argument('--workers', type=int, default=16)
+    parser.add_argument('--rate', type=float, default=None, help="máximo de pedidos por segundo")
+    parser.add_argument('--retries', type=int, default=5)
+    parser.add_argument('--base-url', default=BASE_URL)
+    args = parser.parse_args()
+
+    seasons = [tuple(int(part) for part in season.split(':')) for season in args.seasons]
+    match_ids = MatchIndex.load(seasons).table['match_id'].tolist()
+
+    summary = download_events(
+        match_ids, base_url=args.base_url, workers=args.workers, rate=args.rate, retries=args.retries, progress=print_progress
+    )
+    print(
+        f"{summary['downloaded']} downloaded ({summary['bytes'] / 2 ** 20:.1f} MiB), {summary['skipped']} already cached, "
+        f"{len(summary['failed'])} failed in {summary['seconds']:.1f} s"
+    )
+    return 1 if summary['failed'] else 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
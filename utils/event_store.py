@@ -0,0 +1,97 @@
+import os
+import pickle
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+EVENT_STORE_SIZE = int(os.environ.get("EVENT_STORE_SIZE", 16))
+EVENT_STORE_DIR = os.environ.get("EVENT_STORE_DIR")
+
+
+class EventStore:
+    """Memoizes what ``loader`` returns for each match (parsed event frames, possession chains).
+
+    Frames live in an in-memory LRU of ``max_size`` matches, optionally backed by
+    pickles in ``directory``. ``version`` goes into the pickle names, so frames
+    written by a loader with another schema are not picked up. Frames are
+    shared between callers and must not be modified in place.
+    """
+
+    def __init__(self, loader, max_size=EVENT_STORE_SIZE, directory=EVENT_STORE_DIR, version=None):
+        self.loader = loader
+        self.max_size = max_size
+        self.directory = Path(directory) if directory else None
+        self.version = version
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._frames = OrderedDict()
+        self._lock = threading.RLock()
+        self._key_locks = {}
+
+    def path(self, key):
+        name = f"{key}-{self.version}" if self.version else f"{key}"
+        return self.directory / f"{name}.pkl"
+
+    def _cached(self, key):
+        with self._lock:
+            if key in self._frames:
+                self._frames.move_to_end(key)
+                self.hits += 1
+                return self._frames[key]
+        return None
+
+    def get(self, key):
+        frame = self._cached(key)
+        if frame is not None:
+            return frame
+
+        # Um lock por jogo: quem pede o mesmo jogo espera, os outros jogos carregam em paralelo
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+        with key_lock:
+            frame = self._cached(key)
+            if frame is not None:
+                return frame
+
+            frame = self._read_disk(key)
+            from_disk = frame is not None
+            if not from_disk:
+                frame = self.loader(key)
+                self._write_disk(key, frame)
+
+            with self._lock:
+                if from_disk:
+                    self.disk_hits += 1
+                else:
+                    self.misses += 1
+                self._frames[key] = frame
+                while len(self._frames) > self.max_size:
+                    self._frames.popitem(last=False)
+                self._key_locks.pop(key, None)
+            return frame
+
+    def _read_disk(self, key):
+        if self.directory is None:
+            return None
+        try:
+            with open(self.path(key), "rb") as f:
+                return pickle.load(f)
+        except FileNotFoundError:
+            return None
+
+    def _write_disk(self, key, frame):
+        if self.directory is None:
+            return
+        self.directory.mkdir(parents=True, exist_ok=True)
+        tmp = self.path(key).with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp, "wb") as f:
+            pickle.dump(frame, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, self.path(key))
+
+    def stats(self):
+        return {"hits": self.hits, "disk_hits": self.disk_hits, "misses": self.misses, "size": len(self._frames)}
+
+    def clear(self):
+        with self._lock:
+            self._frames.clear()
@@ -0,0 +1,129 @@
+import os
+import pickle
+from pathlib import Path
+
+import pandas as pd
+
+from utils.correlation import CorrelationAccumulator
+
+FEATURE_STORE_DIR = os.environ.get("FEATURE_STORE_DIR", "data/store")
+
+ID_COLUMNS = ['player_name', 'team', 'role', 'gender']
+
+
+def partial_aggregates(df, category_columns=ID_COLUMNS[1:]):
+    # Somas, contagens e frequências de categorias por jogador, combináveis entre partições
+    df = df.drop(columns='match_id', errors='ignore')
+    category_cols = [col for col in category_columns if col in df.columns]
+    metric_cols = df.drop(columns=['player_name', *category_cols]).select_dtypes('number').columns
+
+    grouped = df.groupby('player_name', observed=True)
+    categories = pd.concat(
+        [
+            df.groupby(['player_name', col], observed=True).size().rename('count').reset_index().rename(columns={col: 'value'}).assign(column=col)
+            for col in category_cols
+        ],
+        ignore_index=True,
+    ) if category_cols else pd.DataFrame(columns=['player_name', 'value', 'count', 'column'])
+
+    return {
+        'sums': grouped[metric_cols].sum(),
+        'counts': grouped[metric_cols].count(),
+        'categories': categories[['player_name', 'column', 'value', 'count']],
+        'category_columns': category_cols,
+    }
+
+
+def combine_aggregates(left, right):
+    if left is None:
+        return right
+    categories = pd.concat([left['categories'], right['categories']], ignore_index=True)
+    return {
+        'sums': left['sums'].add(right['sums'], fill_value=0),
+        'counts': left['counts'].add(right['counts'], fill_value=0),
+        'categories': categories.groupby(['player_name', 'column', 'value'], as_index=False, observed=True)['count'].sum(),
+        'category_columns': list(dict.fromkeys(left['category_columns'] + right['category_columns'])),
+    }
+
+
+def finalize_aggregates(aggregates):
+    # Moda: categoria mais frequente; em caso de empate a menor, como em Series.mode()[0]
+    categories = aggregates['categories'].sort_values(
+        ['player_name', 'column', 'count', 'value'], ascending=[True, True, False, True]
+    )
+    top = categories.drop_duplicates(['player_name', 'column'])
+    meta = top.pivot(index='player_name', columns='column', values='value')
+    meta = meta.reindex(columns=aggregates['category_columns'])
+    meta.columns.name = None
+
+    sums = aggregates['sums']
+    metrics = sums / aggregates['counts'].where(aggregates['counts'] > 0)
+    metrics = metrics.reindex(index=sums.index)
+
+    return meta.join(metrics, on='player_name').reset_index()
+
+
+class FeatureStore:
+    """Append-only store of player-match rows partitioned by role/competition/season/match_id.
+
+    Each append also folds the new rows into per-role running aggregates, so
+    ``load_aggregated`` costs O(players) instead of re-reading every match, and
+    into a running correlation accumulator returned by ``correlation``.
+    """
+
+    def __init__(self, root=FEATURE_STORE_DIR):
+        self.root = Path(root)
+
+    def partition(self, role, competition_id, season_id, match_id):
+        return self.root / role / str(competition_id) / str(season_id) / f"{match_id}.csv"
+
+    def aggregates_path(self, role):
+        return self.root / role / "_aggregates.pkl"
+
+    def read_aggregates(self, role):
+        try:
+            with open(self.aggregates_path(role), "rb") as f:
+                return pickle.load(f)
+        except FileNotFoundError:
+            return {'aggregates': None, 'matches': set(), 'correlation': CorrelationAccumulator()}
+
+    def write_aggregates(self, role, state):
+        path = self.aggregates_path(role)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        with open(tmp, "wb") as f:
+            pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+
+    def append(self, role, competition_id, season_id, match_id, rows):
+        state = self.read_aggregates(role)
+        if match_id in state['matches']:
+            return False
+
+        path = self.partition(role, competition_id, season_id, match_id)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        rows.to_csv(path, index=False)
+
+        state['aggregates'] = combine_aggregates(state['aggregates'], partial_aggregates(rows))
+        metrics = rows.drop(columns=['match_id', *ID_COLUMNS], errors='ignore').select_dtypes('number')
+        state.setdefault('correlation', CorrelationAccumulator()).update(metrics)
+        state['matches'].add(match_id)
+        self.write_aggregates(role, state)
+        return True
+
+    def matches(self, role):
+        return self.read_aggregates(role)['matches']
+
+    def load_rows(self, role, competition_id='*', season_id='*'):
+        paths = sorted((self.root / role).glob(f"{competition_id}/{season_id}/*.csv"))
+        return pd.concat([pd.read_csv(path) for path in paths], ignore_index=True)
+
+    def correlation(self, role):
+        # Correlação entre as métricas de todas as linhas jogador-jogo guardadas, mantida a cada append
+        return self.read_aggregates(role).get('correlation', CorrelationAccumulator())
+
+    def load_aggregated(self, role):
+        aggregates = self.read_aggregates(role)['aggregates']
+        if aggregates is None:
+            return None
+        return finalize_aggregates(aggregates)
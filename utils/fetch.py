@@ -0,0 +1,194 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from utils.archive import ARCHIVE_PATH, EventArchive
+
+BASE_URL = "https://raw.githubusercontent.com/statsbomb/open-data/master/"
+
+# Configuração por variáveis de ambiente
+CACHE_DIR = os.environ.get("STATSBOMB_CACHE_DIR", ".cache/statsbomb")
+CACHE_TTL = float(os.environ.get("STATSBOMB_CACHE_TTL", 30 * 24 * 3600))
+CACHE_MAX_BYTES = int(os.environ.get("STATSBOMB_CACHE_MAX_BYTES", 2 * 1024 ** 3))
+MIRROR_DIR = os.environ.get("STATSBOMB_MIRROR")
+OFFLINE = os.environ.get("STATSBOMB_OFFLINE", "0") == "1"
+
+
+class DiskCache:
+    """Content-addressed cache of raw responses, keyed by URL.
+
+    Entries expire ``ttl`` seconds after being written; once the cache grows
+    past ``max_bytes`` the least recently read entries are removed.
+    """
+
+    def __init__(self, directory=CACHE_DIR, ttl=CACHE_TTL, max_bytes=CACHE_MAX_BYTES):
+        self.directory = Path(directory)
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+
+    def path(self, url):
+        key = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        return self.directory / key[:2] / f"{key}.json"
+
+    def get(self, url, stale=False):
+        # stale=True devolve também as entradas expiradas (modo offline: os dados do open-data não mudam)
+        path = self.path(url)
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            return None
+
+        now = time.time()
+        if not stale and self.ttl is not None and now - stat.st_mtime > self.ttl:
+            path.unlink(missing_ok=True)
+            return None
+
+        content = path.read_bytes()
+        # atime marca o último acesso (LRU), mtime a data de escrita (TTL)
+        os.utime(path, (now, stat.st_mtime))
+        return content
+
+    def contains(self, url):
+        # Como get, mas sem ler o ficheiro nem mexer no atime
+        try:
+            stat = self.path(url).stat()
+        except FileNotFoundError:
+            return False
+        return self.ttl is None or time.time() - stat.st_mtime <= self.ttl
+
+    def set(self, url, content, evict=True):
+        path = self.path(url)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp.write_bytes(content)
+        os.replace(tmp, path)
+        if evict:
+            self.evict()
+
+    def entries(self):
+        return [p for p in self.directory.glob("*/*.json") if p.is_file()]
+
+    def evict(self):
+        if self.max_bytes is None:
+            return
+        files = [(p, p.stat()) for p in self.entries()]
+        total = sum(stat.st_size for _, stat in files)
+        if total <= self.max_bytes:
+            return
+        for path, stat in sorted(files, key=lambda item: item[1].st_atime):
+            path.unlink(missing_ok=True)
+            total -= stat.st_size
+            if total <= self.max_bytes:
+                break
+
+    def clear(self):
+        for path in self.entries():
+            path.unlink(missing_ok=True)
+
+
+class Fetcher:
+    """Fetches StatsBomb open-data files from a local mirror, the disk cache or the network.
+
+    ``mirror`` is the root of a local checkout of the open-data repository
+    (the directory that contains ``data/``) and ``archive`` the path of an
+    ``EventArchive`` with compressed event files. With ``offline=True`` a miss
+    in the mirror, the archive and the cache raises ``FileNotFoundError``
+    instead of going to the network, and expired cache entries are still
+    served.
+    """
+
+    def __init__(self, cache=None, mirror=MIRROR_DIR, offline=OFFLINE, timeout=30, retries=3, pool_size=10,
+                 archive=ARCHIVE_PATH):
+        self.cache = cache
+        self.mirror = Path(mirror) if mirror else None
+        self.archive = EventArchive(archive) if archive else None
+        self.offline = offline
+        self.timeout = timeout
+        self.stats = {"mirror": 0, "archive": 0, "cache": 0, "network": 0}
+
+        retry = Retry(total=retries, backoff_factor=0.5, status_forcelist=(429, 500, 502, 503, 504))
+        adapter = HTTPAdapter(max_retries=retry, pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session = requests.Session()
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def mirror_path(self, url):
+        if self.mirror is None or not url.startswith(BASE_URL):
+            return None
+        return self.mirror / url[len(BASE_URL):]
+
+    def archive_key(self, url):
+        # data/events/{match_id}.json -> match_id
+        prefix = f"{BASE_URL}data/events/"
+        if self.archive is None or not url.startswith(prefix) or not url.endswith(".json"):
+            return None
+        stem = url[len(prefix):-len(".json")]
+        return int(stem) if stem.isdigit() else None
+
+    def locate(self, url):
+        # De onde viria url agora, sem o ler: ('mirror' | 'archive' | 'cache', caminho) ou ('network', None)
+        path = self.mirror_path(url)
+        if path is not None and path.is_file():
+            return "mirror", path
+        match_id = self.archive_key(url)
+        if match_id is not None and match_id in self.archive:
+            return "archive", self.archive.path
+        if self.cache is not None and (self.offline and self.cache.path(url).is_file() or self.cache.contains(url)):
+            return "cache", self.cache.path(url)
+        return "network", None
+
+    def get_bytes_with_source(self, url):
+        path = self.mirror_path(url)
+        if path is not None and path.is_file():
+            self.stats["mirror"] += 1
+            return path.read_bytes(), "mirror"
+
+        match_id = self.archive_key(url)
+        if match_id is not None and match_id in self.archive:
+            self.stats["archive"] += 1
+            return self.archive.get_bytes(match_id), "archive"
+
+        if self.cache is not None:
+            content = self.cache.get(url, stale=self.offline)
+            if content is not None:
+                self.stats["cache"] += 1
+                return content, "cache"
+
+        if self.offline:
+            raise FileNotFoundError(f"{url} is not available offline")
+
+        response = self.session.get(url, timeout=self.timeout)
+        response.raise_for_status()
+        self.stats["network"] += 1
+        content = response.content
+        if self.cache is not None:
+            self.cache.set(url, content)
+        return content, "network"
+
+    def get_bytes(self, url):
+        return self.get_bytes_with_source(url)[0]
+
+    def get_json(self, url):
+        return json.loads(self.get_bytes(url))
+
+
+_fetcher = None
+
+
+def get_fetcher():
+    global _fetcher
+    if _fetcher is None:
+        _fetcher = Fetcher(cache=DiskCache())
+    return _fetcher
+
+
+def set_fetcher(fetcher):
+    global _fetcher
+    _fetcher = fetcher
@@ -1,95 +1,134 @@
-import requests
-import pandas as pd
-
-def get_data(url):
-    response = requests.get(url)
-    if response.status_code == 200:
-        data = response.json()
-    return data
+import hashlib
 
-def process_events(match_id: int):
-    url_events = f"https://raw.githubusercontent.com/statsbomb/open-data/master/data/events/{match_id}.json"
-    data = get_data(url_events)
-    events = pd.json_normalize(data)
+import numpy as np
+import pandas as pd
 
-    events['time_seconds'] = events.apply(
-        lambda row: int(row['minute']) * 60 + int(row['second']), axis=1
-    )
+from utils.event_store import EventStore
+from utils.fetch import BASE_URL, get_fetcher
+from utils.possessions import possession_chains, recovery_from_chains
+from utils.tracing import traced
+from utils.zones import DANGER_ZONES, ZONE_LABELS_PT, count_zone_entries, unpack_locations, zone_entries
 
+@traced
+def get_data(url):
+    return get_fetcher().get_json(url)
+
+# Campos usados pelas métricas e o tipo de cada coluna
+EVENT_FIELDS = {
+    'index': 'int64',
+    'possession': 'int64',
+    'possession_team.name': 'str',
+    'team.name': 'str',
+    'type.name': 'str',
+    'carry.end_location': object,
+    'minute': 'int64',
+    'second': 'int64',
+}
+
+# possession_chains só precisa da localização de cada evento para o max_x
+CHAIN_FIELDS = {
+    **EVENT_FIELDS,
+    'location': object,
+}
+
+def _field_getter(path):
+    def get(event):
+        value = event
+        for key in path:
+            if not isinstance(value, dict):
+                return None
+            value = value.get(key)
+        return value
+    return get
+
+def parse_events(data, fields=EVENT_FIELDS):
+    # Lê apenas os campos pedidos, evento a evento, sem criar o frame completo do json_normalize
+    getters = [(field, _field_getter(field.split('.'))) for field in fields]
+    columns = {field: [] for field in fields}
+    for event in data:
+        for field, get in getters:
+            columns[field].append(get(event))
+
+    arrays = {}
+    for field, dtype in fields.items():
+        values = columns[field]
+        if dtype is object:
+            arrays[field] = pd.Series(values, dtype=object).fillna(np.nan)
+        elif dtype == 'str':
+            arrays[field] = pd.Series(values).fillna(np.nan)
+        elif dtype == 'bool':
+            arrays[field] = pd.Series([value is True for value in values], dtype='bool')
+        elif None in values:
+            arrays[field] = pd.Series(values, dtype='float64')
+        else:
+            arrays[field] = pd.Series(values, dtype=dtype)
+    return pd.DataFrame(arrays)
+
+@traced
+def build_events(data, fields=EVENT_FIELDS):
+    events = parse_events(data, fields)
+
+    events['time_seconds'] = events['minute'] * 60 + events['second']
     events['time_bin'] = (events['time_seconds'] // 300).astype(int)
-    events = events[events["time_seconds"] != 0][['index', 'possession', 'possession_team.name', 'team.name', 'type.name', 'carry.end_location', 'time_seconds', 'time_bin']]
+    columns = [field for field in fields if field not in ('minute', 'second')] + ['time_seconds', 'time_bin']
+    events = events[events["time_seconds"] != 0][columns]
 
     return events
 
-def get_recovery(match_id: int):
-    events = process_events(match_id)
-
-    recovery_events = []
-
-    last_team = events.iloc[0]['possession_team.name']
-    last_time = events.iloc[0]['time_seconds']
-
-    for i in range(1, len(events)):
-        curr = events.iloc[i]
-        curr_team = curr['possession_team.name']
-        curr_time = curr['time_seconds']
-
-        if curr_team != last_team:
-            recovery_time = curr_time - last_time
+@traced
+def load_events(match_id: int, fields=EVENT_FIELDS):
+    url_events = f"{BASE_URL}data/events/{match_id}.json"
+    return build_events(get_data(url_events), fields)
 
-            recovery_events.append({
-                'lost_by': last_team,
-                'recovered_by': curr_team,
-                'recovery_time': recovery_time,
-                'time_seconds': curr_time,
-                'time_bin': curr['time_bin']
-            })
+@traced
+def load_match(match_id: int):
+    # Um só parse por jogo: a localização serve para o max_x das posses e não fica no frame dos eventos
+    events = load_events(match_id, CHAIN_FIELDS)
+    return events.drop(columns='location'), possession_chains(events)
 
-            last_team = curr_team
-            last_time = curr_time
+# Os pickles em disco ficam associados ao esquema dos campos: mudar os campos invalida-os
+EVENT_SCHEMA = hashlib.sha256(repr(sorted((field, str(dtype)) for field, dtype in CHAIN_FIELDS.items())).encode()).hexdigest()[:12]
 
-    change_possession = pd.DataFrame(recovery_events)
+# Eventos e posses de cada jogo, calculados uma vez e partilhados por todas as métricas
+event_store = EventStore(load_match, version=EVENT_SCHEMA)
 
-    recovery_df = change_possession[change_possession['recovery_time'] > 0]
-    recovery_df['minute'] = (recovery_df['time_seconds'] // 60).astype(int)
-
-    return recovery_df
-
-def get_danger_zones(match_id: int):
-    events = process_events(match_id)
-
-    events_dangerous = events[
-        (events['type.name'] == 'Carry')
-        & (events['carry.end_location'].notnull())
-    ]
-    events_dangerous[['x', 'y']] = events_dangerous['carry.end_location'].apply(pd.Series)
-
-    events_dangerous['final_third_entry'] = events_dangerous['x'] >= 80
-
-    events_dangerous['penalty_area_entry'] = (events_dangerous['x'] >= 102) & (events_dangerous['y'].between(18, 62))
-
-    events_dangerous['zone_entry'] = events_dangerous['final_third_entry'] | events_dangerous['penalty_area_entry']
+@traced
+def process_events(match_id: int):
+    # Cada jogo é processado uma única vez por processo
+    return event_store.get(match_id)[0]
 
-    entries = events_dangerous[events_dangerous['zone_entry']].copy()
-    entries['minute'] = (entries['time_seconds'] // 60).astype(int)
+@traced
+def get_possession_chains(match_id: int):
+    return event_store.get(match_id)[1]
 
-    final_third = entries[entries['final_third_entry']].copy()
-    final_third['zone'] = 'Final Third'
+@traced
+def compute_recovery(events: pd.DataFrame, columns=()):
+    return recovery_from_chains(possession_chains(events, locations=False), events, columns)
 
-    penalty_area = entries[entries['penalty_area_entry']].copy()
-    penalty_area['zone'] = 'Penalty Area'
+@traced
+def get_recovery(match_id: int):
+    return recovery_from_chains(get_possession_chains(match_id), process_events(match_id))
 
-    entries = pd.concat([final_third, penalty_area])
-    entries['zone_pt'] = entries['zone'].replace({
-        'Final Third': 'Zona de Ataque',
-        'Penalty Area': 'Grande Área'
-    })
-    entries['zone_team'] = entries['team.name'] + ' - ' + entries['zone_pt']
+@traced
+def compute_danger_zones(events: pd.DataFrame, zones=DANGER_ZONES):
+    events_dangerous, masks = zone_entries(events, zones)
+    # Uma coluna por zona: 'Final Third' -> final_third_entry
+    for name, mask in zip(zones, masks.T):
+        events_dangerous[name.lower().replace(' ', '_') + '_entry'] = mask
+    events_dangerous['zone_entry'] = masks.any(axis=1)
 
-    entry_counts = entries.groupby(['minute', 'zone_team', 'team.name']).size().reset_index(name='entries')
+    entry_counts = count_zone_entries(events, zones)
+    entry_counts['zone_team'] = entry_counts['team.name'] + ' - ' + entry_counts['zone'].map(ZONE_LABELS_PT).fillna(entry_counts['zone'])
+    keys = [key for key in ('match_id', 'minute', 'zone_team', 'team.name') if key in entry_counts.columns]
+    entry_counts = entry_counts.sort_values(keys, ignore_index=True)[[*keys, 'entries']]
 
     return events_dangerous, entry_counts
 
+@traced
+def get_danger_zones(match_id: int):
+    return compute_danger_zones(process_events(match_id))
+
+@traced
 def get_two_metrics(recovery_df: pd.DataFrame, events_danger: pd.DataFrame):
     # Recuperação de posse de bola
     recovery_by_minute = recovery_df.groupby(['recovered_by', 'minute'])['recovery_time'].mean().reset_index()
@@ -0,0 +1,43 @@
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+
+# A partir deste número de jogadores usa-se o MiniBatchKMeans
+MINIBATCH_THRESHOLD = 20_000
+
+
+def _fit_k(X_scaled, k, seed, minibatch, sample_size):
+    from sklearn.cluster import KMeans, MiniBatchKMeans
+    from sklearn.metrics import davies_bouldin_score, silhouette_score
+
+    if minibatch:
+        model = MiniBatchKMeans(n_clusters=k, random_state=seed, batch_size=4096, n_init=3)
+    else:
+        model = KMeans(n_clusters=k, random_state=seed)
+    labels = model.fit_predict(X_scaled)
+
+    # O silhouette é O(n²), por isso é calculado numa amostra quando há muitos jogadores
+    sample = sample_size if sample_size and len(X_scaled) > sample_size else None
+    return {
+        'k': k,
+        'seed': seed,
+        'inertia': model.inertia_,
+        'silhouette': silhouette_score(X_scaled, labels, sample_size=sample, random_state=seed),
+        'davies_bouldin': davies_bouldin_score(X_scaled, labels),
+    }
+
+
+def sweep_k(X_scaled, k_values=range(2, 11), seeds=(42,), n_jobs=-1, minibatch=None, sample_size=2000):
+    X_scaled = np.ascontiguousarray(X_scaled, dtype=np.float64)
+    if minibatch is None:
+        minibatch = len(X_scaled) > MINIBATCH_THRESHOLD
+
+    runs = Parallel(n_jobs=n_jobs)(
+        delayed(_fit_k)(X_scaled, k, seed, minibatch, sample_size) for k in k_values for seed in seeds
+    )
+    runs = pd.DataFrame(runs)
+    return runs.groupby('k', as_index=False)[['inertia', 'silhouette', 'davies_bouldin']].mean()
+
+
+def best_k(sweep):
+    return int(sweep.loc[sweep['silhouette'].idxmax(), 'k'])
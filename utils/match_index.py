@@ -0,0 +1,154 @@
+import argparse
+import json
+import os
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from utils.columnar import read_meta, read_table, write_table
+from utils.fetch import BASE_URL, get_fetcher
+
+MATCH_INDEX_DIR = os.environ.get("MATCH_INDEX_DIR", ".cache/match_index")
+
+# Campo do JSON de data/matches -> coluna do índice
+MATCH_FIELDS = {
+    'match_id': ('match_id',),
+    'competition_id': ('competition', 'competition_id'),
+    'season_id': ('season', 'season_id'),
+    'match_date': ('match_date',),
+    'gender': ('home_team', 'home_team_gender'),
+    'home_team': ('home_team', 'home_team_name'),
+    'away_team': ('away_team', 'away_team_name'),
+    'home_score': ('home_score',),
+    'away_score': ('away_score',),
+}
+
+
+def _field(match, path):
+    value = match
+    for key in path:
+        value = value.get(key) if isinstance(value, dict) else None
+    return value
+
+
+def matches_table(data):
+    # Só os campos do índice, sem passar pelo json_normalize do payload inteiro
+    table = pd.DataFrame({column: [_field(match, path) for match in data] for column, path in MATCH_FIELDS.items()})
+    for column in ('match_id', 'competition_id', 'season_id'):
+        table[column] = table[column].astype(np.int64)
+    for column in ('home_score', 'away_score'):
+        table[column] = pd.to_numeric(table[column]).astype(np.float64 if table[column].isna().any() else np.int64)
+    return table
+
+
+class MatchIndex:
+    """Match metadata (gender, competition, season, date, teams, score) keyed by match_id.
+
+    Each season is fetched once and persisted as a columnar table under
+    ``directory``; lookups go through a hash ``pd.Index`` over match_id.
+    """
+
+    def __init__(self, table):
+        self.table = table.drop_duplicates('match_id').reset_index(drop=True)
+        self.index = pd.Index(self.table['match_id'].to_numpy())
+
+    @classmethod
+    def load(cls, seasons, directory=MATCH_INDEX_DIR, rebuild=False):
+        tables = [load_season(competition_id, season_id, directory, rebuild) for competition_id, season_id in seasons]
+        return cls(pd.concat(tables, ignore_index=True) if tables else matches_table([]))
+
+    def __len__(self):
+        return len(self.table)
+
+    def positions(self, match_ids):
+        # -1 para os jogos que não estão no índice
+        return self.index.get_indexer(np.asarray(match_ids))
+
+    def lookup(self, match_ids, column):
+        # get_indexer + take em vez de um merge; NaN para os jogos que não estão no índice
+        positions = self.positions(match_ids)
+        values = pd.Series(np.asarray(self.table[column])[np.maximum(positions, 0)])
+        return values.where(positions >= 0)
+
+    def attach(self, df, columns=('gender',), how='inner'):
+        # O mesmo que fazer merge com a tabela de jogos (o inner mantém a ordem de df)
+        positions = self.positions(df['match_id'])
+        if how == 'inner':
+            df = df[positions >= 0].reset_index(drop=True)
+        else:
+            df = df.copy()
+        for column in columns:
+            df[column] = self.lookup(df['match_id'], column).to_numpy()
+        return df
+
+
+def season_path(competition_id, season_id, directory=MATCH_INDEX_DIR):
+    return Path(directory) / f"{competition_id}_{season_id}.cols"
+
+
+def season_url(competition_id, season_id):
+    return f"{BASE_URL}data/matches/{competition_id}/{season_id}.json"
+
+
+def is_fresh(meta, fetcher, url):
+    """Whether an index built from ``meta`` still matches what ``url`` would give now.
+
+    It must come from the same place (mirror, cache, ...) as it would now, that
+    file must not be newer than the index, and, online, the index must not be
+    older than the cache TTL, past which the matches file is fetched again.
+    """
+    if not meta or meta.get('url') != url:
+        return False
+    source, path = fetcher.locate(url)
+    if source != meta['located'] or (str(path) if path else None) != meta['path']:
+        return False
+    if path is not None and path.stat().st_mtime > meta['fetched_at']:
+        return False
+    ttl = fetcher.cache.ttl if fetcher.cache is not None else None
+    return fetcher.offline or ttl is None or time.time() - meta['fetched_at'] <= ttl
+
+
+def load_season(competition_id, season_id, directory=MATCH_INDEX_DIR, rebuild=False):
+    # directory=None constrói o índice sem o guardar
+    path = season_path(competition_id, season_id, directory) if directory else None
+    url = season_url(competition_id, season_id)
+    fetcher = get_fetcher()
+    if path is not None and not rebuild and is_fresh(read_meta(path), fetcher, url):
+        return read_table(path, mmap=False)
+
+    content, source = fetcher.get_bytes_with_source(url)
+    table = matches_table(json.loads(content))
+    if path is None:
+        return table
+    # Origem do índice, para saber quando deixa de corresponder ao ficheiro de jogos
+    located, located_path = fetcher.locate(url)
+    meta = {
+        'url': url,
+        'source': source,
+        'located': located,
+        'path': str(located_path) if located_path else None,
+        'fetched_at': time.time(),
+    }
+    try:
+        write_table(table, path, meta=meta)
+    except OSError:
+        return table
+    return read_table(path, mmap=False)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Constrói o índice de metadados dos jogos de uma ou mais épocas")
+    parser.add_argument('seasons', nargs='+', help="pares competition_id:season_id, ex: 37:90 2:27")
+    parser.add_argument('--directory', default=MATCH_INDEX_DIR)
+    parser.add_argument('--rebuild', action='store_true')
+    args = parser.parse_args()
+
+    seasons = [tuple(int(part) for part in season.split(':')) for season in args.seasons]
+    index = MatchIndex.load(seasons, args.directory, rebuild=args.rebuild)
+    print(f"{len(index)} matches indexed in {args.directory}")
+
+
+if __name__ == '__main__':
+    main()
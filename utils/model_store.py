@@ -0,0 +1,61 @@
+import os
+from pathlib import Path
+
+import joblib
+
+from utils.cache import fingerprint
+
+MODEL_STORE_DIR = os.environ.get("MODEL_STORE_DIR", ".cache/models")
+MODEL_STORE_MAX_ARTIFACTS = int(os.environ.get("MODEL_STORE_MAX_ARTIFACTS", 32))
+
+
+class ModelStore:
+    """Fitted models and their outputs on disk, keyed by input data hash and hyperparameters.
+
+    Artifacts that have not been read for longest are removed once there are
+    more than ``max_artifacts`` of them.
+    """
+
+    def __init__(self, directory=MODEL_STORE_DIR, max_artifacts=MODEL_STORE_MAX_ARTIFACTS):
+        self.directory = Path(directory)
+        self.max_artifacts = max_artifacts
+
+    def key(self, kind, data, **params):
+        return f"{kind}-{fingerprint(data, params)[:32]}"
+
+    def path(self, key):
+        return self.directory / f"{key}.joblib"
+
+    def load(self, key):
+        path = self.path(key)
+        try:
+            artifacts = joblib.load(path)
+        except (FileNotFoundError, EOFError):
+            return None
+        os.utime(path)
+        return artifacts
+
+    def save(self, key, artifacts):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        tmp = self.path(key).with_suffix(f".{os.getpid()}.tmp")
+        joblib.dump(artifacts, tmp)
+        os.replace(tmp, self.path(key))
+        self.evict()
+
+    def evict(self):
+        paths = sorted(self.directory.glob("*.joblib"), key=lambda p: p.stat().st_mtime)
+        for path in paths[:max(len(paths) - self.max_artifacts, 0)]:
+            path.unlink(missing_ok=True)
+
+    def get_or_fit(self, key, fit):
+        artifacts = self.load(key)
+        if artifacts is None:
+            artifacts = fit()
+            try:
+                self.save(key, artifacts)
+            except OSError:
+                pass
+        return artifacts
+
+
+model_store = ModelStore()
@@ -0,0 +1,122 @@
+import numpy as np
+import pandas as pd
+
+from utils.zones import DANGER_ZONES, unpack_locations, zone_masks
+
+PITCH_LENGTH = 120
+
+CHAIN_COLUMNS = [
+    'possession', 'team', 'start_index', 'end_index', 'start_time', 'end_time', 'duration', 'n_events', 'max_x',
+    'start_row',
+]
+
+
+def chain_bounds(events):
+    # Run-length encoding: começa uma nova posse quando muda o possession, a equipa ou o jogo
+    n = len(events)
+    boundary = np.ones(n, dtype=bool)
+    if n > 1:
+        possession = events['possession'].to_numpy()
+        team = events['possession_team.name']
+        boundary[1:] = (possession[1:] != possession[:-1]) | team.ne(team.shift()).to_numpy()[1:]
+        if 'match_id' in events.columns:
+            match_id = events['match_id'].to_numpy()
+            boundary[1:] |= match_id[1:] != match_id[:-1]
+    starts = np.flatnonzero(boundary)
+    ends = np.append(starts[1:], n) - 1
+    return starts, ends
+
+
+def furthest_x(events, starts):
+    # As localizações StatsBomb são relativas à equipa do evento: as da equipa sem bola são invertidas
+    own = events['team.name'].eq(events['possession_team.name']).fillna(False).to_numpy(dtype=bool)
+    x = np.fmax(unpack_locations(events['location'])[0], unpack_locations(events['carry.end_location'])[0])
+    x = np.where(own, x, PITCH_LENGTH - x)
+    return np.fmax.reduceat(x, starts) if len(starts) else np.empty(0)
+
+
+def possession_chains(events: pd.DataFrame, locations=True):
+    """One row per possession chain of ``process_events`` output (or a season frame with match_id).
+
+    ``start_row`` is the position of the chain's first event in ``events``, so
+    columns of that event can be taken without scanning the events again.
+    ``max_x`` is the furthest x reached from the possessing team's point of view
+    and needs a ``location`` column (frames parsed with CHAIN_FIELDS or
+    PLAYER_FIELDS); ``locations=False`` leaves it NaN when only the boundaries
+    are needed.
+    """
+    starts, ends = chain_bounds(events)
+    time = events['time_seconds'].to_numpy()
+    index = events['index'].to_numpy()
+
+    chains = pd.DataFrame({
+        'possession': events['possession'].to_numpy()[starts],
+        'team': events['possession_team.name'].iloc[starts].to_numpy(),
+        'start_index': index[starts],
+        'end_index': index[ends],
+        'start_time': time[starts],
+        'end_time': time[ends],
+        'duration': time[ends] - time[starts],
+        'n_events': ends - starts + 1,
+        'max_x': furthest_x(events, starts) if locations else np.nan,
+        'start_row': starts,
+    }, columns=CHAIN_COLUMNS)
+    if 'match_id' in events.columns:
+        chains.insert(0, 'match_id', events['match_id'].to_numpy()[starts])
+    return chains
+
+
+def chain_of_rows(chains, rows):
+    # Posse a que pertence cada linha de events (as posses são intervalos contíguos)
+    return np.searchsorted(chains['start_row'].to_numpy(), rows, side='right') - 1
+
+
+def recovery_from_chains(chains: pd.DataFrame, events: pd.DataFrame, columns=()):
+    # Uma recuperação é a primeira posse de uma sequência de posses da mesma equipa
+    team = chains['team']
+    change = team.ne(team.shift())
+    if 'match_id' in chains.columns:
+        new_match = chains['match_id'].ne(chains['match_id'].shift())
+    else:
+        new_match = pd.Series(False, index=chains.index)
+        new_match.iloc[:1] = True
+
+    starts = chains[change | new_match]
+    first_of_match = new_match[starts.index].to_numpy()
+    rows = starts['start_row'].to_numpy()
+
+    change_possession = pd.DataFrame({
+        'lost_by': starts['team'].shift().to_numpy(),
+        'recovered_by': starts['team'].to_numpy(),
+        'recovery_time': starts['start_time'].diff().to_numpy(),
+        'time_seconds': starts['start_time'].to_numpy(),
+        'time_bin': events['time_bin'].to_numpy()[rows],
+    })
+    if 'match_id' in chains.columns:
+        change_possession.insert(0, 'match_id', starts['match_id'].to_numpy())
+    # Colunas extra do evento que inicia a nova posse (ex: jogador que recuperou)
+    for column in columns:
+        change_possession[column] = events[column].to_numpy()[rows]
+
+    change_possession = change_possession[~first_of_match].reset_index(drop=True)
+    change_possession['recovery_time'] = change_possession['recovery_time'].astype(starts['start_time'].dtype)
+
+    recovery_df = change_possession[change_possession['recovery_time'] > 0].copy()
+    recovery_df['minute'] = (recovery_df['time_seconds'] // 60).astype(int)
+
+    return recovery_df
+
+
+def entries_per_possession(chains: pd.DataFrame, events: pd.DataFrame, zones=DANGER_ZONES, location='carry.end_location',
+                           types=('Carry',)):
+    """Zone entries (by default carries) of each chain: one column per zone, aligned with ``chains``."""
+    selected = events['type.name'].isin(types).to_numpy() & events[location].notna().to_numpy()
+    rows = np.flatnonzero(selected)
+    x, y = unpack_locations(events[location].to_numpy()[rows])
+    masks = zone_masks(x, y, zones)
+
+    chain = chain_of_rows(chains, rows)
+    counts = np.zeros((len(chains), len(zones)), dtype=np.int64)
+    for i in range(len(zones)):
+        counts[:, i] = np.bincount(chain[masks[:, i]], minlength=len(chains))
+    return pd.DataFrame(counts, columns=list(zones), index=chains.index)
@@ -0,0 +1,186 @@
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from utils.downloader import download_events, print_progress
+from utils.feature_store import FeatureStore, finalize_aggregates, partial_aggregates
+from utils.fetch import BASE_URL, DiskCache, Fetcher, set_fetcher
+from utils.individual_match import (
+    EVENT_FIELDS,
+    build_events,
+    compute_danger_zones,
+    compute_recovery,
+    get_data,
+    unpack_locations,
+)
+from utils.match_index import MatchIndex
+
+# Campos adicionais necessários para as métricas por jogador
+PLAYER_FIELDS = {
+    **EVENT_FIELDS,
+    'player.name': 'str',
+    'position.name': 'str',
+    'location': object,
+    'pass.recipient.name': 'str',
+    'pass.length': 'float64',
+    'pass.end_location': object,
+    'pass.outcome.name': 'str',
+    'pass.shot_assist': 'bool',
+    'pass.goal_assist': 'bool',
+    'pass.aerial_won': 'bool',
+    'shot.statsbomb_xg': 'float64',
+    'shot.aerial_won': 'bool',
+    'duel.type.name': 'str',
+    'duel.outcome.name': 'str',
+    'clearance.aerial_won': 'bool',
+    'miscontrol.aerial_won': 'bool',
+}
+
+ATTACKER_POSITIONS = {
+    'Right Wing', 'Left Wing', 'Right Center Forward', 'Left Center Forward', 'Center Forward', 'Secondary Striker',
+}
+DEFENDER_POSITIONS = {
+    'Right Back', 'Left Back', 'Right Center Back', 'Left Center Back', 'Center Back', 'Right Wing Back', 'Left Wing Back',
+}
+
+ATTACKER_COLUMNS = [
+    'player_name', 'team', 'role', 'xg', 'shots', 'key_passes', 'progressive_passes_received', 'pressures',
+    'touches_in_box', 'match_id', 'penalty_area_entries', 'recovery_time',
+]
+DEFENDER_COLUMNS = [
+    'player_name', 'team', 'role', 'clearances', 'interceptions', 'tackles_won', 'pressures', 'aerial_duels_won',
+    'pass_completion_pct', 'long_passes_completed', 'fouls_committed', 'match_id', 'final_third_entries', 'recovery_time',
+]
+
+TACKLE_WON_OUTCOMES = {'Won', 'Success', 'Success In Play', 'Success Out'}
+# Eventos em que o jogador toca na bola (as conduções não contam: são o intervalo entre dois toques)
+TOUCH_TYPES = {
+    'Pass', 'Ball Receipt*', 'Shot', 'Dribble', 'Miscontrol', 'Ball Recovery', 'Clearance', 'Interception', 'Block',
+    'Dispossessed', 'Goal Keeper',
+}
+
+
+def player_match_metrics(match_id: int):
+    url_events = f"{BASE_URL}data/events/{match_id}.json"
+    events = build_events(get_data(url_events), PLAYER_FIELDS)
+
+    players = events.dropna(subset=['player.name'])
+    # Posição mais frequente de cada jogador com as mesmas contagens vetorizadas do aggregate_player_metrics
+    positions = players[['player.name', 'position.name']].set_axis(['player_name', 'position'], axis=1)
+    positions = finalize_aggregates(partial_aggregates(positions, category_columns=['position']))
+    info = players.groupby('player.name')[['team.name']].first().set_axis(['team'], axis=1)
+    info['position'] = positions.set_index('player_name')['position']
+
+    type_name = events['type.name']
+    is_pass = type_name == 'Pass'
+    completed = is_pass & events['pass.outcome.name'].isna()
+    x, y = unpack_locations(events['location'])
+    end_x, _ = unpack_locations(events['pass.end_location'])
+    # As localizações da StatsBomb estão sempre no sentido de ataque da equipa do evento
+    in_box = (x >= 102) & (y >= 18) & (y <= 62)
+    # A StatsBomb só marca os aéreos ganhos com estas flags; os Duel aéreos são sempre 'Aerial Lost'
+    aerial_won = events[['pass.aerial_won', 'shot.aerial_won', 'clearance.aerial_won', 'miscontrol.aerial_won']].any(axis=1)
+
+    def count(mask, by='player.name'):
+        return events[mask].groupby(by).size()
+
+    metrics = pd.DataFrame({
+        'xg': events[type_name == 'Shot'].groupby('player.name')['shot.statsbomb_xg'].sum(),
+        'shots': count(type_name == 'Shot'),
+        'key_passes': count(is_pass & (events['pass.shot_assist'] | events['pass.goal_assist'])),
+        'progressive_passes_received': count(completed & (end_x - x >= 30), by='pass.recipient.name'),
+        'pressures': count(type_name == 'Pressure'),
+        'touches_in_box': count(type_name.isin(TOUCH_TYPES) & in_box),
+        'clearances': count(type_name == 'Clearance'),
+        'interceptions': count(type_name == 'Interception'),
+        'tackles_won': count((events['duel.type.name'] == 'Tackle') & events['duel.outcome.name'].isin(TACKLE_WON_OUTCOMES)),
+        'aerial_duels_won': count(aerial_won),
+        'pass_completion_pct': count(completed) / count(is_pass) * 100,
+        'long_passes_completed': count(completed & (events['pass.length'] >= 30)),
+        'fouls_committed': count(type_name == 'Foul Committed'),
+    }, index=info.index).fillna(0)
+
+    count_columns = metrics.columns.drop(['xg', 'pass_completion_pct'])
+    metrics[count_columns] = metrics[count_columns].astype(int)
+
+    events_dangerous, _ = compute_danger_zones(events)
+    entries = events_dangerous.groupby('player.name')[['final_third_entry', 'penalty_area_entry']].sum()
+    metrics['final_third_entries'] = entries['final_third_entry'].reindex(info.index).fillna(0).astype(float)
+    metrics['penalty_area_entries'] = entries['penalty_area_entry'].reindex(info.index).fillna(0).astype(float)
+
+    recovery_df = compute_recovery(events, columns=['player.name'])
+    recovery = recovery_df.groupby('player.name')['recovery_time'].mean()
+    metrics['recovery_time'] = recovery.reindex(info.index).fillna(0)
+
+    metrics = info.join(metrics).rename_axis('player_name').reset_index()
+    metrics['match_id'] = match_id
+
+    attackers = metrics[metrics['position'].isin(ATTACKER_POSITIONS)].assign(role='attacker')
+    defenders = metrics[metrics['position'].isin(DEFENDER_POSITIONS)].assign(role='defender')
+
+    return attackers[ATTACKER_COLUMNS], defenders[DEFENDER_COLUMNS]
+
+
+def _init_worker(mirror, offline):
+    set_fetcher(Fetcher(cache=DiskCache(), mirror=mirror, offline=offline))
+
+
+def build_season_tables(seasons, processes=None, mirror=None, offline=False, store=None, download_workers=16):
+    matches = MatchIndex.load(seasons).table
+    match_ids = matches['match_id'].tolist()
+
+    if not offline:
+        # Descarrega primeiro todos os eventos em paralelo para a cache; os processos depois só leem do disco
+        download_events(match_ids, DiskCache(), mirror=mirror, workers=download_workers, progress=print_progress)
+
+    start = time.perf_counter()
+    with ProcessPoolExecutor(processes, initializer=_init_worker, initargs=(mirror, offline)) as pool:
+        results = list(pool.map(player_match_metrics, match_ids, chunksize=4))
+    elapsed = time.perf_counter() - start
+
+    if store is not None:
+        partitions = zip(
+            match_ids, matches['competition_id'], matches['season_id'], matches['gender'], results
+        )
+        for match_id, competition_id, season_id, gender, (attackers, defenders) in partitions:
+            store.append('attackers', competition_id, season_id, match_id, attackers.assign(gender=gender))
+            store.append('defenders', competition_id, season_id, match_id, defenders.assign(gender=gender))
+
+    attackers = pd.concat([a for a, _ in results], ignore_index=True)
+    defenders = pd.concat([d for _, d in results], ignore_index=True)
+    return attackers, defenders, len(match_ids) / elapsed if elapsed else np.inf
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gera attackers.csv e defenders.csv a partir dos eventos da StatsBomb")
+    parser.add_argument('seasons', nargs='+', help="pares competition_id:season_id, ex: 37:90 2:27")
+    parser.add_argument('--out', default='build', help="pasta de saída; não escreve por cima dos CSV de data/")
+    parser.add_argument('--processes', type=int, default=None)
+    parser.add_argument('--mirror', default=os.environ.get('STATSBOMB_MIRROR'), help="checkout local do open-data")
+    parser.add_argument('--offline', action='store_true')
+    parser.add_argument('--store', default=None, help="pasta da feature store onde acrescentar os jogos")
+    parser.add_argument('--download-workers', type=int, default=16, help="downloads em paralelo antes do processamento")
+    args = parser.parse_args()
+
+    seasons = [tuple(int(part) for part in season.split(':')) for season in args.seasons]
+    set_fetcher(Fetcher(cache=DiskCache(), mirror=args.mirror, offline=args.offline))
+
+    store = FeatureStore(args.store) if args.store else None
+    attackers, defenders, throughput = build_season_tables(
+        seasons, args.processes, args.mirror, args.offline, store, args.download_workers
+    )
+
+    out = Path(args.out)
+    out.mkdir(parents=True, exist_ok=True)
+    attackers.to_csv(out / 'attackers.csv', index=False)
+    defenders.to_csv(out / 'defenders.csv', index=False)
+    print(f"{len(attackers)} attacker rows, {len(defenders)} defender rows, {throughput:.2f} matches/sec")
+
+
+if __name__ == '__main__':
+    main()
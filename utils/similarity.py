@@ -0,0 +1,71 @@
+import numpy as np
+import pandas as pd
+
+
+class SimilarityIndex:
+    """Nearest-neighbour search over standardized player features.
+
+    Players added after the tree was built are kept in a small buffer that is
+    searched by brute force; the tree is rebuilt once the buffer grows beyond
+    ``rebuild_fraction`` of the indexed players.
+    """
+
+    def __init__(self, X_scaled, clusters, players, rebuild_fraction=0.1, leaf_size=40):
+        self.rebuild_fraction = rebuild_fraction
+        self.leaf_size = leaf_size
+        self.X = np.asarray(X_scaled, dtype=np.float64)
+        self.clusters = np.asarray(clusters)
+        self.players = np.asarray(players, dtype=object)
+        self.n_indexed = 0
+        self._positions = {}
+        self._register(self.players, 0)
+        self.rebuild()
+
+    def _register(self, players, offset):
+        for position, player in enumerate(players, start=offset):
+            self._positions.setdefault(player, position)
+
+    def rebuild(self):
+        from sklearn.neighbors import KDTree
+
+        self.tree = KDTree(self.X, leaf_size=self.leaf_size)
+        self.n_indexed = len(self.X)
+
+    def add(self, X_scaled, clusters, players):
+        self._register(players, len(self.X))
+        self.X = np.vstack([self.X, np.asarray(X_scaled, dtype=np.float64)])
+        self.clusters = np.concatenate([self.clusters, np.asarray(clusters)])
+        self.players = np.concatenate([self.players, np.asarray(players, dtype=object)])
+        if len(self.X) - self.n_indexed > self.rebuild_fraction * self.n_indexed:
+            self.rebuild()
+
+    def query(self, X_query, k=5):
+        # Devolve (distâncias, posições) dos k vizinhos mais próximos de cada linha de X_query
+        X_query = np.atleast_2d(np.asarray(X_query, dtype=np.float64))
+        k_tree = min(k, self.n_indexed)
+        distances, positions = self.tree.query(X_query, k=k_tree)
+
+        pending = self.X[self.n_indexed:]
+        if len(pending):
+            pending_distances = np.sqrt(((X_query[:, None, :] - pending[None, :, :]) ** 2).sum(axis=2))
+            distances = np.hstack([distances, pending_distances])
+            positions = np.hstack([positions, np.broadcast_to(np.arange(self.n_indexed, len(self.X)), pending_distances.shape)])
+            order = np.argsort(distances, axis=1)[:, :k]
+            distances = np.take_along_axis(distances, order, axis=1)
+            positions = np.take_along_axis(positions, order, axis=1)
+
+        return distances, positions
+
+    def similar_players(self, player, k=5):
+        position = self._positions[player]
+        distances, positions = self.query(self.X[position], k=k + 1)
+        keep = positions[0] != position
+        positions, distances = positions[0][keep][:k], distances[0][keep][:k]
+        return pd.DataFrame({
+            'player': self.players[positions],
+            'cluster': self.clusters[positions],
+            'distance': distances,
+        })
+
+    def cluster_of(self, player):
+        return self.clusters[self._positions[player]]
@@ -0,0 +1,310 @@
+import argparse
+import json
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+FORMATION = [
+    'Goalkeeper', 'Right Back', 'Right Center Back', 'Left Center Back', 'Left Back', 'Right Center Midfield',
+    'Center Defensive Midfield', 'Left Center Midfield', 'Right Wing', 'Center Forward', 'Left Wing',
+]
+# Quanto mais avançada a posição, mais eventos no último terço
+FORMATION_DEPTH = np.array([0.05, 0.35, 0.2, 0.2, 0.35, 0.55, 0.45, 0.55, 0.8, 0.85, 0.8])
+
+IN_POSSESSION_TYPES = ['Pass', 'Ball Receipt*', 'Carry', 'Shot', 'Dribble', 'Miscontrol', 'Dispossessed', 'Foul Won']
+IN_POSSESSION_P = [0.36, 0.3, 0.26, 0.015, 0.02, 0.015, 0.01, 0.02]
+OUT_OF_POSSESSION_TYPES = ['Pressure', 'Duel', 'Interception', 'Clearance', 'Ball Recovery', 'Foul Committed', 'Block']
+OUT_OF_POSSESSION_P = [0.42, 0.14, 0.08, 0.14, 0.1, 0.07, 0.05]
+TYPE_IDS = {
+    'Pass': 30, 'Ball Receipt*': 42, 'Carry': 43, 'Shot': 16, 'Dribble': 14, 'Miscontrol': 38, 'Dispossessed': 3,
+    'Foul Won': 21, 'Pressure': 17, 'Duel': 4, 'Interception': 10, 'Clearance': 9, 'Ball Recovery': 2,
+    'Foul Committed': 22, 'Block': 6,
+}
+
+MATCH_SECONDS = 5700
+
+# Médias por jogo próximas das de data/*.csv
+ATTACKER_MEANS = {
+    'xg': 0.2, 'shots': 1.6, 'key_passes': 0.9, 'progressive_passes_received': 7.5, 'pressures': 11.1,
+    'touches_in_box': 4.2, 'penalty_area_entries': 1.85, 'recovery_time': 37.0,
+}
+DEFENDER_MEANS = {
+    'clearances': 4.5, 'interceptions': 1.35, 'tackles_won': 0.4, 'pressures': 10.0, 'aerial_duels_won': 1.0,
+    'pass_completion_pct': 75.0, 'long_passes_completed': 5.2, 'fouls_committed': 0.83, 'final_third_entries': 5.2,
+    'recovery_time': 35.3,
+}
+ATTACKER_COLUMNS = [
+    'player_name', 'team', 'role', 'xg', 'shots', 'key_passes', 'progressive_passes_received', 'pressures',
+    'touches_in_box', 'match_id', 'penalty_area_entries', 'recovery_time',
+]
+DEFENDER_COLUMNS = [
+    'player_name', 'team', 'role', 'clearances', 'interceptions', 'tackles_won', 'pressures', 'aerial_duels_won',
+    'pass_completion_pct', 'long_passes_completed', 'fouls_committed', 'match_id', 'final_third_entries', 'recovery_time',
+]
+
+
+def team_names(n_teams):
+    return [f'Team {i:03d}' for i in range(n_teams)]
+
+
+def squad(team):
+    return [f'{team} Player {i:02d}' for i in range(len(FORMATION))]
+
+
+def generate_match_events(match_id=0, home='Home FC', away='Away FC', n_events=3400, seed=0):
+    """Returns one match of StatsBomb-style events (the JSON list, before any normalization)."""
+    rng = np.random.default_rng([seed, match_id])
+    teams = [home, away]
+    players = [squad(home), squad(away)]
+
+    # Posses: ~6% dos eventos iniciam uma nova posse; a equipa troca em 80% dos casos
+    new_possession = rng.random(n_events) < 0.06
+    new_possession[0] = True
+    possession = np.cumsum(new_possession)
+    swaps = rng.random(possession[-1] + 1) < 0.8
+    possession_team = np.cumsum(swaps) % 2
+    event_possession_team = possession_team[possession]
+
+    in_possession = rng.random(n_events) < 0.85
+    acting_team = np.where(in_possession, event_possession_team, 1 - event_possession_team)
+    type_name = np.where(
+        in_possession,
+        rng.choice(IN_POSSESSION_TYPES, n_events, p=IN_POSSESSION_P),
+        rng.choice(OUT_OF_POSSESSION_TYPES, n_events, p=OUT_OF_POSSESSION_P),
+    )
+
+    # Progresso dentro da posse, para que o x avance ao longo da jogada
+    starts = np.flatnonzero(new_possession)
+    sizes = np.diff(np.append(starts, n_events))
+    progress = (np.arange(n_events) - np.repeat(starts, sizes)) / np.repeat(sizes, sizes)
+
+    slot = rng.integers(1, len(FORMATION), n_events)
+    depth = FORMATION_DEPTH[slot]
+    x = np.clip(120 * (0.35 * depth + 0.55 * progress) + rng.normal(0, 12, n_events), 0.5, 119.5)
+    x = np.where(in_possession, x, 120 - x).round(1)
+    y = np.clip(rng.normal(40, 20, n_events), 0.5, 79.5).round(1)
+    end_x = np.clip(x + rng.normal(8, 10, n_events), 0.5, 119.5).round(1)
+    end_y = np.clip(y + rng.normal(0, 10, n_events), 0.5, 79.5).round(1)
+    length = np.hypot(end_x - x, end_y - y).round(2)
+
+    time_seconds = np.sort(rng.integers(1, MATCH_SECONDS, n_events))
+    duration = rng.exponential(1.2, n_events).round(3).tolist()
+    # Convertidos para listas de uma vez: indexar arrays numpy evento a evento é lento
+    end_x, end_y, length = end_x.tolist(), end_y.tolist(), length.tolist()
+    pass_outcome = (rng.random(n_events) < 0.2).tolist()
+    shot_assist = (rng.random(n_events) < 0.03).tolist()
+    recipient = rng.integers(1, len(FORMATION), n_events).tolist()
+    xg = rng.beta(1.2, 9, n_events).round(4).tolist()
+    duel_won = (rng.random(n_events) < 0.5).tolist()
+    aerial = (rng.random(n_events) < 0.08).tolist()
+
+    events = []
+    for i, team in enumerate(teams):
+        events.append({
+            'id': f'{match_id}-{i}', 'index': i + 1, 'period': 1, 'timestamp': '00:00:00.000', 'minute': 0, 'second': 0,
+            'type': {'id': 35, 'name': 'Starting XI'}, 'possession': 1,
+            'possession_team': {'id': 0, 'name': teams[event_possession_team[0]]},
+            'play_pattern': {'id': 1, 'name': 'Regular Play'}, 'team': {'id': i, 'name': team},
+            'tactics': {'formation': 433, 'lineup': [
+                {'player': {'id': j, 'name': name}, 'position': {'id': j + 1, 'name': FORMATION[j]}, 'jersey_number': j + 1}
+                for j, name in enumerate(players[i])
+            ]},
+        })
+
+    rows = zip(
+        range(n_events), possession.tolist(), event_possession_team.tolist(), acting_team.tolist(), type_name.tolist(),
+        slot.tolist(), time_seconds.tolist(), x.tolist(), y.tolist(),
+    )
+    for i, possession_i, possession_team_i, team_i, type_i, slot_i, t, x_i, y_i in rows:
+        minute, second = divmod(t, 60)
+        event = {
+            'id': f'{match_id}-{i + 2}',
+            'index': i + 3,
+            'period': 1 if t < MATCH_SECONDS // 2 else 2,
+            'timestamp': f'00:{minute % 45:02d}:{second:02d}.000',
+            'minute': minute,
+            'second': second,
+            'type': {'id': TYPE_IDS[type_i], 'name': type_i},
+            'possession': possession_i,
+            'possession_team': {'id': possession_team_i, 'name': teams[possession_team_i]},
+            'play_pattern': {'id': 1, 'name': 'Regular Play'},
+            'team': {'id': team_i, 'name': teams[team_i]},
+            'player': {'id': slot_i, 'name': players[team_i][slot_i]},
+            'position': {'id': slot_i + 1, 'name': FORMATION[slot_i]},
+            'location': [x_i, y_i],
+            'duration': duration[i],
+            'related_events': [f'{match_id}-{i + 1}'],
+        }
+        if type_i == 'Carry':
+            event['carry'] = {'end_location': [end_x[i], end_y[i]]}
+        elif type_i == 'Pass':
+            event['pass'] = {
+                'recipient': {'id': recipient[i], 'name': players[team_i][recipient[i]]},
+                'length': length[i],
+                'angle': 0.0,
+                'height': {'id': 1, 'name': 'Ground Pass'},
+                'end_location': [end_x[i], end_y[i]],
+            }
+            if pass_outcome[i]:
+                event['pass']['outcome'] = {'id': 9, 'name': 'Incomplete'}
+            elif shot_assist[i]:
+                event['pass']['shot_assist'] = True
+            if aerial[i]:
+                event['pass']['aerial_won'] = True
+        elif type_i == 'Shot':
+            event['shot'] = {
+                'statsbomb_xg': xg[i],
+                'end_location': [120.0, 40.0],
+                'outcome': {'id': 100, 'name': 'Saved'},
+            }
+        elif type_i == 'Duel':
+            event['duel'] = {
+                'type': {'id': 11, 'name': 'Tackle'},
+                'outcome': {'id': 4, 'name': 'Won'} if duel_won[i] else {'id': 13, 'name': 'Lost In Play'},
+            }
+        elif type_i == 'Clearance' and aerial[i]:
+            event['clearance'] = {'aerial_won': True}
+        events.append(event)
+
+    return events
+
+
+def generate_matches(match_ids, competition_id=37, season_id=90, gender='female', n_teams=12, seed=0):
+    # Lista de jogos no formato de data/matches/{competition_id}/{season_id}.json
+    rng = np.random.default_rng([seed, competition_id, season_id])
+    names = team_names(n_teams)
+    matches = []
+    for match_id in match_ids:
+        home, away = rng.choice(n_teams, 2, replace=False)
+        matches.append({
+            'match_id': int(match_id),
+            'match_date': str(np.datetime64('2020-09-01') + np.timedelta64(int(rng.integers(0, 270)), 'D')),
+            'home_score': int(rng.poisson(1.4)),
+            'away_score': int(rng.poisson(1.1)),
+            'competition': {'competition_id': competition_id, 'country_name': 'England', 'competition_name': f'Competition {competition_id}'},
+            'season': {'season_id': season_id, 'season_name': f'Season {season_id}'},
+            'home_team': {'home_team_id': int(home), 'home_team_name': names[home], 'home_team_gender': gender},
+            'away_team': {'away_team_id': int(away), 'away_team_name': names[away], 'away_team_gender': gender},
+        })
+    return matches
+
+
+def _write_match(root, match_id, home, away, n_events, seed):
+    events = generate_match_events(match_id, home, away, n_events, seed)
+    # json.dumps + write é bastante mais rápido do que json.dump, que escreve aos bocados
+    (root / 'data' / 'events' / f'{match_id}.json').write_text(json.dumps(events, separators=(',', ':')))
+
+
+def write_mirror(root, n_matches, competition_id=37, season_id=90, gender='female', first_match_id=1, n_events=3400,
+                 seed=0, processes=None):
+    # Escreve uma árvore com o formato do open-data (data/matches e data/events), para usar com STATSBOMB_MIRROR
+    root = Path(root)
+    (root / 'data' / 'events').mkdir(parents=True, exist_ok=True)
+    (root / 'data' / 'matches' / str(competition_id)).mkdir(parents=True, exist_ok=True)
+
+    matches = generate_matches(range(first_match_id, first_match_id + n_matches), competition_id, season_id, gender, seed=seed)
+    with open(root / 'data' / 'matches' / str(competition_id) / f'{season_id}.json', 'w') as f:
+        json.dump(matches, f)
+
+    jobs = [
+        (root, match['match_id'], match['home_team']['home_team_name'], match['away_team']['away_team_name'], n_events, seed)
+        for match in matches
+    ]
+    # Cada jogo é independente (o rng é semeado com o match_id), por isso o resultado não depende de processes
+    with ProcessPoolExecutor(processes) as pool:
+        list(pool.map(_write_match, *zip(*jobs), chunksize=16))
+    return matches
+
+
+def generate_player_tables(n_matches=500, n_players=1000, n_teams=20, first_match_id=1, seed=0):
+    """Returns (attackers, defenders) with the same columns as data/attackers.csv and data/defenders.csv."""
+    rng = np.random.default_rng(seed)
+    names = np.array(team_names(n_teams), dtype=object)
+
+    tables = []
+    for role, means, columns, share, per_team in (
+        ('attacker', ATTACKER_MEANS, ATTACKER_COLUMNS, 0.45, 4),
+        ('defender', DEFENDER_MEANS, DEFENDER_COLUMNS, 0.55, 5),
+    ):
+        n_role = max(int(n_players * share), n_teams)
+        player_team = np.arange(n_role) % n_teams
+        player_names = np.array([f'{role.title()} {i:06d}' for i in range(n_role)], dtype=object)
+        # Quatro arquétipos por posição, para que o clustering tenha estrutura
+        archetypes = rng.gamma(4, 0.25, (4, len(means)))
+        style = archetypes[rng.integers(0, 4, n_role)] * rng.gamma(20, 0.05, (n_role, len(means)))
+
+        by_team = [np.flatnonzero(player_team == team) for team in range(n_teams)]
+        match_rows, player_rows = [], []
+        for match_id in range(first_match_id, first_match_id + n_matches):
+            for team in rng.choice(n_teams, 2, replace=False):
+                squad_players = by_team[team]
+                chosen = rng.choice(squad_players, min(per_team, len(squad_players)), replace=False)
+                player_rows.append(chosen)
+                match_rows.append(np.full(len(chosen), match_id))
+        players = np.concatenate(player_rows)
+        match_ids = np.concatenate(match_rows)
+
+        table = pd.DataFrame({
+            'player_name': player_names[players],
+            'team': names[player_team[players]],
+            'role': role,
+            'match_id': match_ids,
+        })
+        rates = style[players] * np.array(list(means.values()))
+        for j, metric in enumerate(means):
+            if metric == 'xg':
+                table[metric] = rng.gamma(0.6, rates[:, j] / 0.6)
+            elif metric == 'pass_completion_pct':
+                table[metric] = np.clip(rng.normal(rates[:, j], 10), 0, 100)
+            elif metric == 'recovery_time':
+                table[metric] = rng.gamma(2, rates[:, j] / 2)
+            elif metric in ('penalty_area_entries', 'final_third_entries'):
+                table[metric] = rng.poisson(rates[:, j]).astype(float)
+            else:
+                table[metric] = rng.poisson(rates[:, j])
+        tables.append(table[columns])
+
+    return tables[0], tables[1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gera dados sintéticos com o formato da StatsBomb e de data/*.csv")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    mirror = subparsers.add_parser('mirror', help="árvore data/matches + data/events para STATSBOMB_MIRROR")
+    mirror.add_argument('--out', required=True)
+    mirror.add_argument('--matches', type=int, default=380)
+    mirror.add_argument('--competition', type=int, default=37)
+    mirror.add_argument('--season', type=int, default=90)
+    mirror.add_argument('--gender', default='female')
+    mirror.add_argument('--events', type=int, default=3400)
+    mirror.add_argument('--seed', type=int, default=0)
+    mirror.add_argument('--processes', type=int, default=None)
+
+    tables = subparsers.add_parser('tables', help="attackers.csv e defenders.csv")
+    tables.add_argument('--out', required=True)
+    tables.add_argument('--matches', type=int, default=500)
+    tables.add_argument('--players', type=int, default=1000)
+    tables.add_argument('--teams', type=int, default=20)
+    tables.add_argument('--seed', type=int, default=0)
+
+    args = parser.parse_args()
+    start = time.perf_counter()
+    if args.command == 'mirror':
+        write_mirror(args.out, args.matches, args.competition, args.season, args.gender, n_events=args.events, seed=args.seed,
+                     processes=args.processes)
+        print(f"{args.matches} matches written to {args.out} in {time.perf_counter() - start:.1f} s")
+    else:
+        attackers, defenders = generate_player_tables(args.matches, args.players, args.teams, seed=args.seed)
+        out = Path(args.out)
+        out.mkdir(parents=True, exist_ok=True)
+        attackers.to_csv(out / 'attackers.csv', index=False)
+        defenders.to_csv(out / 'defenders.csv', index=False)
+        print(f"{len(attackers)} attacker rows, {len(defenders)} defender rows in {time.perf_counter() - start:.1f} s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,191 @@
+import functools
+import itertools
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+
+PERF_TRACE = os.environ.get("PERF_TRACE", "0") == "1"
+PERF_TRACE_MAX_SPANS = int(os.environ.get("PERF_TRACE_MAX_SPANS", 10000))
+
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def rss_bytes():
+    # Memória residente do processo; /proc é barato de ler, tracemalloc abrandaria tudo o que se está a medir
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE
+    except OSError:
+        import resource
+
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def n_rows(value):
+    if isinstance(value, (pd.DataFrame, pd.Series, np.ndarray, list)):
+        return len(value)
+    if isinstance(value, tuple):
+        for item in value:
+            rows = n_rows(item)
+            if rows is not None:
+                return rows
+    return None
+
+
+class _ThreadState(threading.local):
+    def __init__(self, enabled):
+        self.enabled = enabled
+        self.run = 0
+        self.depth = 0
+        self.spans = []
+
+
+class Tracer:
+    """Records timed spans per thread (one Streamlit session runs in one thread)."""
+
+    def __init__(self, enabled=PERF_TRACE, max_spans=PERF_TRACE_MAX_SPANS):
+        self.default_enabled = enabled
+        self.history = deque(maxlen=max_spans)
+        self._local = _ThreadState(enabled)
+        self._lock = threading.Lock()
+        self._runs = 0
+        self._seq = itertools.count()
+
+    @property
+    def enabled(self):
+        return self._local.enabled
+
+    @enabled.setter
+    def enabled(self, value):
+        self._local.enabled = value
+
+    def start_run(self):
+        # Chamado no início de cada rerun: os spans anteriores desta sessão deixam de aparecer no painel
+        with self._lock:
+            self._runs += 1
+            self._local.run = self._runs
+        self._local.spans = []
+        self._local.depth = 0
+
+    def spans(self):
+        return list(self._local.spans)
+
+    @contextmanager
+    def span(self, name, rows_in=None):
+        if not self.enabled:
+            yield {}
+            return
+
+        local = self._local
+        depth = local.depth
+        record = {
+            'run': local.run,
+            'seq': next(self._seq),
+            'name': name,
+            'depth': depth,
+            'start': time.time(),
+            'rows_in': rows_in,
+            'rows_out': None,
+        }
+        rss = rss_bytes()
+        local.depth = depth + 1
+        start = time.perf_counter()
+        try:
+            yield record
+        finally:
+            record['seconds'] = time.perf_counter() - start
+            record['memory_delta'] = rss_bytes() - rss
+            local.depth = depth
+            local.spans.append(record)
+            with self._lock:
+                self.history.append(record)
+
+    def to_jsonl(self, spans=None):
+        if spans is None:
+            with self._lock:
+                spans = list(self.history)
+        return ''.join(json.dumps(span, default=str) + '\n' for span in spans)
+
+    def export(self, path, spans=None):
+        with open(path, 'a') as f:
+            f.write(self.to_jsonl(spans))
+
+
+tracer = Tracer()
+
+
+def span(name, rows_in=None):
+    return tracer.span(name, rows_in)
+
+
+def traced(fn):
+    name = f"{fn.__module__.rsplit('.', 1)[-1]}.{fn.__qualname__}"
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        # Desligado, o custo é só esta verificação
+        if not tracer.enabled:
+            return fn(*args, **kwargs)
+        with tracer.span(name, n_rows(args[0]) if args else None) as record:
+            value = fn(*args, **kwargs)
+            record['rows_out'] = n_rows(value)
+        return value
+
+    return wrapper
+
+
+def summarize(spans):
+    # Tempo total e próprio (sem os spans filhos) por função
+    rows = []
+    for i, record in enumerate(spans):
+        # Os filhos terminam antes do pai, por isso aparecem antes dele na lista
+        children = 0.0
+        for child in reversed(spans[:i]):
+            if child['depth'] <= record['depth']:
+                break
+            if child['depth'] == record['depth'] + 1:
+                children += child['seconds']
+        rows.append({'name': record['name'], 'seconds': record['seconds'], 'self_seconds': record['seconds'] - children})
+    if not rows:
+        return pd.DataFrame(columns=['name', 'calls', 'seconds', 'self_seconds'])
+    summary = pd.DataFrame(rows).groupby('name').agg(
+        calls=('seconds', 'size'), seconds=('seconds', 'sum'), self_seconds=('self_seconds', 'sum')
+    )
+    return summary.sort_values('self_seconds', ascending=False).reset_index()
+
+
+def render_trace_panel():
+    import streamlit as st
+
+    with st.sidebar.expander("Desempenho", expanded=False):
+        st.toggle("Medir tempos", value=tracer.default_enabled, key='perf_trace', help="Regista os tempos de cada função a partir do próximo rerun")
+        spans = tracer.spans()
+        if not spans:
+            st.caption("Sem medições neste rerun.")
+            return
+
+        breakdown = pd.DataFrame({
+            'Função': ['· ' * span['depth'] + span['name'] for span in spans],
+            'ms': [span['seconds'] * 1000 for span in spans],
+            'Linhas': [span['rows_out'] if span['rows_out'] is not None else span['rows_in'] for span in spans],
+            'Memória (MiB)': [span['memory_delta'] / 2 ** 20 for span in spans],
+        })
+        # Ordem de início, para que cada função apareça antes das que chamou
+        order = np.argsort([span['seq'] for span in spans])
+        st.dataframe(breakdown.iloc[order], hide_index=True)
+        total = sum(span['seconds'] for span in spans if span['depth'] == 0)
+        st.caption(f"{len(spans)} spans, {total:.2f} s no total")
+
+        summary = summarize(spans)
+        summary['seconds'] *= 1000
+        summary['self_seconds'] *= 1000
+        st.dataframe(summary.rename(columns={
+            'name': 'Função', 'calls': 'Chamadas', 'seconds': 'Total (ms)', 'self_seconds': 'Próprio (ms)',
+        }), hide_index=True)
+        st.download_button("Exportar (JSONL)", tracer.to_jsonl(), file_name='spans.jsonl', mime='application/jsonl')
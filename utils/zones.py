@@ -0,0 +1,101 @@
+import numpy as np
+import pandas as pd
+
+
+def unpack_locations(values):
+    # Converte uma coluna de listas [x, y(, z)] em dois arrays float (NaN quando não existe)
+    values = pd.Series(values)
+    xy = np.full((len(values), 2), np.nan)
+    present = values.notna().to_numpy()
+    if present.any():
+        locations = values[present].tolist()
+        try:
+            # Caso comum (todas [x, y] ou todas [x, y, z]): uma só conversão em C
+            xy[present] = np.array(locations, dtype=np.float64)[:, :2]
+        except ValueError:
+            xy[present] = [location[:2] for location in locations]
+    return xy[:, 0], xy[:, 1]
+
+
+def rectangle(x_min=None, x_max=None, y_min=None, y_max=None):
+    # Limites inclusivos; None deixa o lado aberto
+    return {
+        'kind': 'rectangle',
+        'bounds': [
+            -np.inf if x_min is None else x_min,
+            np.inf if x_max is None else x_max,
+            -np.inf if y_min is None else y_min,
+            np.inf if y_max is None else y_max,
+        ],
+    }
+
+
+def polygon(vertices):
+    # Vértices [(x, y), ...] por ordem; o polígono fecha-se sozinho
+    return {'kind': 'polygon', 'vertices': np.asarray(vertices, dtype=np.float64)}
+
+
+# Coordenadas StatsBomb: campo de 120 x 80, a equipa que tem a bola ataca da esquerda para a direita
+DANGER_ZONES = {
+    'Final Third': rectangle(x_min=80),
+    'Penalty Area': rectangle(x_min=102, y_min=18, y_max=62),
+}
+ZONE_LABELS_PT = {
+    'Final Third': 'Zona de Ataque',
+    'Penalty Area': 'Grande Área',
+}
+
+
+def _inside_polygon(x, y, vertices):
+    # Ray casting vetorizado: cada aresta é testada contra todos os pontos de uma vez
+    inside = np.zeros(len(x), dtype=bool)
+    x0, y0 = vertices[:, 0], vertices[:, 1]
+    x1, y1 = np.roll(x0, -1), np.roll(y0, -1)
+    for ax, ay, bx, by in zip(x0, y0, x1, y1):
+        crosses = (ay > y) != (by > y)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            x_cross = ax + (y - ay) * (bx - ax) / (by - ay)
+        inside ^= crosses & (x < x_cross)
+    return inside
+
+
+def zone_masks(x, y, zones=DANGER_ZONES):
+    """Returns an (n_points, n_zones) boolean matrix; NaN locations are in no zone."""
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    specs = list(zones.values())
+    masks = np.zeros((len(x), len(specs)), dtype=bool)
+
+    # Todos os retângulos numa só comparação com broadcasting (n_points x n_retângulos)
+    rectangles = [i for i, spec in enumerate(specs) if spec['kind'] == 'rectangle']
+    if rectangles:
+        bounds = np.array([specs[i]['bounds'] for i in rectangles], dtype=np.float64)
+        masks[:, rectangles] = (
+            (x[:, None] >= bounds[:, 0]) & (x[:, None] <= bounds[:, 1])
+            & (y[:, None] >= bounds[:, 2]) & (y[:, None] <= bounds[:, 3])
+        )
+
+    for i, spec in enumerate(specs):
+        if spec['kind'] == 'polygon':
+            masks[:, i] = _inside_polygon(x, y, spec['vertices'])
+    return masks
+
+
+def zone_entries(events, zones=DANGER_ZONES, location='carry.end_location', types=('Carry',)):
+    # Eventos (por omissão conduções) com o destino unpacked em x, y e a matriz de zonas correspondente
+    selected = events[events['type.name'].isin(types) & events[location].notnull()].copy()
+    selected['x'], selected['y'] = unpack_locations(selected[location])
+    return selected, zone_masks(selected['x'].to_numpy(), selected['y'].to_numpy(), zones)
+
+
+def count_zone_entries(events, zones=DANGER_ZONES, by=('minute', 'team.name'), location='carry.end_location', types=('Carry',)):
+    """Entries per zone and group; works on one match or on a whole season with a match_id column."""
+    selected, masks = zone_entries(events, zones, location, types)
+    if 'minute' in by and 'minute' not in selected.columns:
+        selected['minute'] = (selected['time_seconds'] // 60).astype(int)
+    keys = (['match_id'] if 'match_id' in selected.columns and 'match_id' not in by else []) + list(by)
+
+    rows, zone = np.nonzero(masks)
+    entries = pd.DataFrame({key: selected[key].to_numpy()[rows] for key in keys})
+    entries['zone'] = np.asarray(list(zones), dtype=object)[zone]
+    return entries.groupby([*keys, 'zone'], sort=True).size().reset_index(name='entries')